@@ -0,0 +1,51 @@
+"""
+Create the indexes declared in models.py that are missing from an existing
+database. ``create_all`` only creates missing tables, so indexes added to a
+table that already exists have to be applied with this script:
+
+    python apply_indexes.py            # create missing indexes
+    python apply_indexes.py --dry-run  # only list them
+"""
+import argparse
+
+from sqlalchemy import inspect
+
+import models
+from database import engine
+
+
+def missing_indexes(bind=engine):
+    """
+    Return the declared indexes whose table exists but whose index does not
+    """
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+
+    missing = []
+    for table in models.Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name not in existing:
+                missing.append(index)
+    return missing
+
+
+def apply_indexes(bind=engine, dry_run=False):
+    indexes = missing_indexes(bind)
+    for index in indexes:
+        columns = ", ".join(column.name for column in index.columns)
+        print(f"{'Would create' if dry_run else 'Creating'} {index.name} on {index.table.name} ({columns})")
+        if not dry_run:
+            index.create(bind=bind)
+    if not indexes:
+        print("All declared indexes are present")
+    return indexes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create indexes declared in models.py that are missing from the database")
+    parser.add_argument("--dry-run", action="store_true", help="list missing indexes without creating them")
+    args = parser.parse_args()
+    apply_indexes(dry_run=args.dry_run)
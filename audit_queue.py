@@ -0,0 +1,341 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from anyio import CapacityLimiter, to_thread
+from sqlalchemy import event, exc, insert
+
+import models
+from database import SessionLocal
+
+# Audit write mode: "sync" writes the audit row in the request's own transaction,
+# "buffered" queues it and writes it in batches from a background task
+AUDIT_MODE = os.getenv("AUDIT_MODE", "sync")
+AUDIT_SPOOL_PATH = os.getenv("AUDIT_SPOOL_PATH", "audit_spool.jsonl")
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+AUDIT_DEAD_LETTER_PATH = os.getenv("AUDIT_DEAD_LETTER_PATH", "audit_dead_letter.jsonl")
+
+logger = logging.getLogger("audit_queue")
+
+# Errors caused by the row itself (e.g. a foreign key to a missing user);
+# anything else, such as a lost connection, is retried
+ROW_ERRORS = (exc.IntegrityError, exc.DataError)
+
+
+class AuditWriter:
+    """
+    Write-behind audit pipeline.
+
+    Entries are queued once the request's transaction commits (see
+    enqueue_on_commit), appended to a local spool file and kept in memory
+    until a background task inserts them with one multi-row INSERT per batch.
+    A batch is flushed when it reaches ``batch_size`` entries or every
+    ``flush_interval`` seconds. If a batch fails, its rows are inserted one at
+    a time and rows the database rejects are moved to the dead letter file,
+    so one bad row cannot hold back the others. After each batch the spool is
+    rewritten to the entries still pending, so on startup only entries that
+    never reached the database are replayed. Delivery is at-least-once: a
+    crash between the INSERT commit and the spool rewrite replays that batch.
+    """
+
+    def __init__(self, spool_path=AUDIT_SPOOL_PATH, batch_size=AUDIT_BATCH_SIZE,
+                 flush_interval=AUDIT_FLUSH_INTERVAL, dead_letter_path=AUDIT_DEAD_LETTER_PATH):
+        self.spool_path = spool_path
+        self.dead_letter_path = dead_letter_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        # Entries are enqueued from the endpoint worker threads
+        self._lock = threading.Lock()
+        self._pending = deque()
+        self._seq = 0
+        self._spool = None
+
+        self._loop = None
+        self._wakeup = None
+        self._flush_lock = None
+        self._task = None
+
+        self._stats = {
+            "enqueued": 0,
+            "replayed": 0,
+            "flushed": 0,
+            "batches": 0,
+            "flush_failures": 0,
+            "dead_lettered": 0,
+            "flush_seconds_total": 0.0,
+            "last_flush_seconds": 0.0,
+            "last_batch_size": 0,
+            "entry_latency_seconds_total": 0.0,
+            "entry_latency_seconds_max": 0.0,
+        }
+
+    async def start(self):
+        """
+        Replay unflushed spool entries and start the background flusher
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        # Flushes get a worker thread of their own rather than a slot of the
+        # default limiter, which bounds the endpoint threadpool
+        self._limiter = CapacityLimiter(1)
+
+        self._replay_spool()
+        self._spool = open(self.spool_path, "a", encoding="utf-8")
+        self._task = asyncio.create_task(self._run())
+
+        if self._pending:
+            self._wakeup.set()
+
+    async def stop(self):
+        """
+        Stop the flusher and drain everything still pending
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        try:
+            await self.flush()
+        finally:
+            # Anything left unflushed stays in the spool for the next startup
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+
+    def enqueue_on_commit(self, db, audit_data: dict):
+        """
+        Queue an audit entry once db commits; it is dropped if db rolls back
+        """
+        row = dict(audit_data)
+        row.setdefault("created_at", datetime.now())
+        db.info.setdefault("pending_audit", []).append(row)
+
+    def enqueue(self, audit_data: dict):
+        """
+        Queue an audit entry. The entry is in the spool before this returns.
+        """
+        row = dict(audit_data)
+        row.setdefault("created_at", datetime.now())
+
+        with self._lock:
+            self._seq += 1
+            self._write_spool({"seq": self._seq, "entry": _serialize(row)})
+            self._pending.append((self._seq, time.monotonic(), row))
+            self._stats["enqueued"] += 1
+            batch_ready = len(self._pending) >= self.batch_size
+
+        if batch_ready and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def flush(self):
+        """
+        Write all pending entries in batches of at most ``batch_size``
+        """
+        async with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._pending.popleft()
+                             for _ in range(min(self.batch_size, len(self._pending)))]
+                if not batch:
+                    return
+
+                started = time.perf_counter()
+                try:
+                    await to_thread.run_sync(self._insert_batch, [row for _, _, row in batch], limiter=self._limiter)
+                except Exception as batch_error:
+                    with self._lock:
+                        self._stats["flush_failures"] += 1
+                    logger.warning("Audit batch of %d failed, inserting rows one by one: %s", len(batch), batch_error)
+                    done, inserted = await to_thread.run_sync(self._insert_rows, batch, limiter=self._limiter)
+                    if done < len(batch):
+                        # The database itself is failing; retry the rest on the next cycle
+                        with self._lock:
+                            self._pending.extendleft(reversed(batch[done:]))
+                        if done:
+                            self._checkpoint(inserted, time.perf_counter() - started)
+                        raise
+                    batch = inserted
+                elapsed = time.perf_counter() - started
+
+                self._checkpoint(batch, elapsed)
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = len(self._pending)
+        stats["mode"] = AUDIT_MODE
+        stats["batch_size"] = self.batch_size
+        stats["flush_interval"] = self.flush_interval
+        stats["avg_flush_seconds"] = (
+            stats["flush_seconds_total"] / stats["batches"] if stats["batches"] else 0.0
+        )
+        stats["avg_entry_latency_seconds"] = (
+            stats["entry_latency_seconds_total"] / stats["flushed"] if stats["flushed"] else 0.0
+        )
+        return stats
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Audit flush failed, will retry")
+
+    def _insert_batch(self, rows):
+        db = SessionLocal()
+        try:
+            db.execute(insert(models.AuditDetailsModel).values(rows))
+            db.commit()
+        finally:
+            db.close()
+
+    def _insert_rows(self, batch):
+        """
+        Insert the entries of a failed batch one at a time, dead-lettering
+        rows the database rejects. Returns (how many entries were dealt with,
+        the entries inserted); fewer are dealt with than the batch holds when
+        a row fails for another reason.
+        """
+        inserted = []
+        for done, entry in enumerate(batch):
+            seq, _, row = entry
+            try:
+                self._insert_batch([row])
+            except ROW_ERRORS as row_error:
+                self._dead_letter(seq, row, row_error)
+            except Exception:
+                logger.exception("Audit entry %d could not be written", seq)
+                return done, inserted
+            else:
+                inserted.append(entry)
+        return len(batch), inserted
+
+    def _dead_letter(self, seq, row, error):
+        logger.error("Audit entry %d rejected by the database, moved to %s: %s",
+                     seq, self.dead_letter_path, error)
+        with self._lock:
+            with open(self.dead_letter_path, "a", encoding="utf-8") as dead_letter:
+                dead_letter.write(json.dumps({"seq": seq, "error": str(error).splitlines()[0],
+                                              "entry": _serialize(row)}) + "\n")
+            self._stats["dead_lettered"] += 1
+
+    def _checkpoint(self, batch, elapsed):
+        """
+        Drop written and dead-lettered entries from the spool and count the
+        inserted ones in batch
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._compact_spool()
+            if not batch:
+                return
+
+            for _, enqueued_at, _ in batch:
+                latency = now - enqueued_at
+                self._stats["entry_latency_seconds_total"] += latency
+                self._stats["entry_latency_seconds_max"] = max(
+                    self._stats["entry_latency_seconds_max"], latency
+                )
+            self._stats["flushed"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["flush_seconds_total"] += elapsed
+            self._stats["last_flush_seconds"] = elapsed
+            self._stats["last_batch_size"] = len(batch)
+
+    def _compact_spool(self):
+        """
+        Rewrite the spool to the entries still pending; call with the lock held
+        """
+        if self._spool is None:
+            return
+        self._spool.close()
+        compacted_path = self.spool_path + ".tmp"
+        with open(compacted_path, "w", encoding="utf-8") as compacted:
+            for seq, _, row in self._pending:
+                compacted.write(json.dumps({"seq": seq, "entry": _serialize(row)}) + "\n")
+        os.replace(compacted_path, self.spool_path)
+        self._spool = open(self.spool_path, "a", encoding="utf-8")
+
+    def _write_spool(self, record):
+        if self._spool is None:
+            self._spool = open(self.spool_path, "a", encoding="utf-8")
+        self._spool.write(json.dumps(record) + "\n")
+        # Hand the line to the OS so it survives a crash of this process
+        self._spool.flush()
+
+    def _replay_spool(self):
+        if not os.path.exists(self.spool_path):
+            return
+
+        entries = {}
+        with open(self.spool_path, encoding="utf-8") as spool:
+            for line in spool:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-write
+                    continue
+                entries[record["seq"]] = record["entry"]
+
+        unflushed = sorted(entries)
+
+        # Compact the spool down to the unflushed entries; this also drops a
+        # torn last line so new appends start on a clean line
+        compacted_path = self.spool_path + ".tmp"
+        with open(compacted_path, "w", encoding="utf-8") as compacted:
+            for seq in unflushed:
+                compacted.write(json.dumps({"seq": seq, "entry": entries[seq]}) + "\n")
+        os.replace(compacted_path, self.spool_path)
+
+        now = time.monotonic()
+        with self._lock:
+            for seq in unflushed:
+                self._pending.append((seq, now, _deserialize(entries[seq])))
+                self._stats["replayed"] += 1
+            self._seq = max(entries, default=0)
+
+
+def _serialize(row):
+    return {key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in row.items()}
+
+
+def _deserialize(row):
+    row = dict(row)
+    if row.get("created_at"):
+        row["created_at"] = datetime.fromisoformat(row["created_at"])
+    return row
+
+
+audit_writer = AuditWriter() if AUDIT_MODE == "buffered" else None
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def queue_committed_audit_entries(session):
+    rows = session.info.pop("pending_audit", None)
+    if rows and audit_writer is not None:
+        for row in rows:
+            audit_writer.enqueue(row)
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def drop_rolled_back_audit_entries(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop("pending_audit", None)
@@ -0,0 +1,56 @@
+"""
+Store the default global role for every user that has none. GET
+/user-roles/{user_id} and the login lookup compute that default on the fly,
+so this is only needed to make the roles visible in sfr_users itself:
+
+    python backfill_roles.py            # insert the missing roles
+    python backfill_roles.py --dry-run  # only count them
+
+The rows are written with a single INSERT ... SELECT.
+"""
+import argparse
+
+from sqlalchemy import and_, func, insert, literal, select
+
+import models
+from database import SessionLocal
+
+
+def users_without_role():
+    """
+    Select the ids of users without a global role
+    """
+    global_role = select(models.TemplateAccessModel.id).where(and_(
+        models.TemplateAccessModel.user_id == models.UserModel.user_id,
+        models.TemplateAccessModel.template_id == None  # Using NULL for global roles
+    ))
+    return select(models.UserModel.user_id).where(~global_role.exists())
+
+
+def backfill_roles(dry_run=False):
+    db = SessionLocal()
+    try:
+        if dry_run:
+            missing = db.execute(select(func.count()).select_from(users_without_role().subquery())).scalar()
+            print(f"Would create the default '{models.DEFAULT_ACCESS_TYPE}' role for {missing} users")
+            return missing
+
+        missing_users = users_without_role().subquery()
+        result = db.execute(
+            insert(models.TemplateAccessModel).from_select(
+                ["user_id", "access_type", "template_id"],
+                select(missing_users.c.user_id, literal(models.DEFAULT_ACCESS_TYPE), literal(None))
+            )
+        )
+        db.commit()
+        print(f"Created the default '{models.DEFAULT_ACCESS_TYPE}' role for {result.rowcount} users")
+        return result.rowcount
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Store the default global role for users that have none")
+    parser.add_argument("--dry-run", action="store_true", help="count the users without creating roles")
+    args = parser.parse_args()
+    backfill_roles(dry_run=args.dry_run)
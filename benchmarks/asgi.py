@@ -0,0 +1,84 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from urllib.parse import urlencode
+
+
+class ASGIDriver:
+    """
+    Minimal in-process HTTP driver for an ASGI app, so benchmarks measure the
+    application and database rather than sockets and an HTTP client library.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    @asynccontextmanager
+    async def lifespan(self):
+        """
+        Run the app's startup and shutdown handlers around the benchmark
+        """
+        receive_queue = asyncio.Queue()
+        send_queue = asyncio.Queue()
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+        task = asyncio.create_task(self.app(scope, receive_queue.get, send_queue.put))
+
+        await receive_queue.put({"type": "lifespan.startup"})
+        message = await send_queue.get()
+        if message["type"] != "lifespan.startup.complete":
+            raise RuntimeError(f"Application startup failed: {message}")
+        try:
+            yield
+        finally:
+            await receive_queue.put({"type": "lifespan.shutdown"})
+            await send_queue.get()
+            await task
+
+    async def request(self, method, path, params=None, json_body=None, headers=None):
+        """
+        Send one request and return (status, headers, body bytes)
+        """
+        body = json.dumps(json_body).encode() if json_body is not None else b""
+        raw_headers = [(b"host", b"benchmark")]
+        if json_body is not None:
+            raw_headers.append((b"content-type", b"application/json"))
+            raw_headers.append((b"content-length", str(len(body)).encode()))
+        for key, value in (headers or {}).items():
+            raw_headers.append((key.lower().encode(), value.encode()))
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method.upper(),
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": urlencode(params or {}, doseq=True).encode(),
+            "root_path": "",
+            "headers": raw_headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("benchmark", 80),
+        }
+
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Block until the app is done; a disconnect is never reported
+            await asyncio.Event().wait()
+
+        response = {"status": None, "headers": [], "body": []}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return response["status"], response["headers"], b"".join(response["body"])
@@ -0,0 +1,77 @@
+"""
+Compare benchmarks.load results against a stored baseline.
+
+A scenario regresses when its p95 latency grows by more than --threshold
+(a fraction, 0.25 = 25%) or when its most expensive request issues more
+statements than in the baseline; statement counts do not depend on the
+machine or on cache hit rates, so that check is exact. Exits with status 1 when anything regressed:
+
+    python -m benchmarks.compare benchmarks/baselines/sqlite-small.json results.json
+"""
+import argparse
+import json
+import sys
+
+# Latency changes smaller than this are noise whatever the threshold
+MIN_DELTA_MS = 0.5
+
+
+def compare(baseline, current, threshold):
+    """
+    Return [(scenario, baseline result, current result, problems)]
+    """
+    rows = []
+    for name, result in current["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        problems = []
+        if base is None:
+            rows.append((name, None, result, ["new scenario"]))
+            continue
+        if result["errors"]:
+            problems.append(f"{result['errors']} errors")
+        delta_ms = result["p95_ms"] - base["p95_ms"]
+        if delta_ms > MIN_DELTA_MS and delta_ms > base["p95_ms"] * threshold:
+            problems.append(f"p95 +{delta_ms / base['p95_ms']:.0%}")
+        if base["max_statements"] is not None and result["max_statements"] is not None \
+                and result["max_statements"] > base["max_statements"]:
+            problems.append(f"statements {base['max_statements']} -> {result['max_statements']}")
+        rows.append((name, base, result, problems))
+    for name in baseline["scenarios"].keys() - current["scenarios"].keys():
+        rows.append((name, baseline["scenarios"][name], None, ["not run"]))
+    return rows
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("results")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p95 growth, as a fraction")
+    args = parser.parse_args()
+
+    with open(args.baseline) as baseline_file, open(args.results) as results_file:
+        baseline, current = json.load(baseline_file), json.load(results_file)
+
+    for key in ("database", "questions", "concurrency"):
+        if baseline["meta"].get(key) != current["meta"].get(key):
+            print(f"warning: {key} differs ({baseline['meta'].get(key)} vs {current['meta'].get(key)}), "
+                  "latencies are not directly comparable")
+
+    rows = compare(baseline, current, args.threshold)
+    print(f"{'scenario':<22}{'base p95':>10}{'p95':>10}{'change':>9}{'base max stmts':>16}{'max stmts':>11}  result")
+    regressed = False
+    for name, base, result, problems in rows:
+        base_p95 = f"{base['p95_ms']:.2f}" if base else "-"
+        p95 = f"{result['p95_ms']:.2f}" if result else "-"
+        change = f"{result['p95_ms'] / base['p95_ms'] - 1:+.0%}" if base and result and base["p95_ms"] else "-"
+        base_statements = str(base["max_statements"]) if base and base["max_statements"] is not None else "-"
+        statements = str(result["max_statements"]) if result and result["max_statements"] is not None else "-"
+        blocking = [problem for problem in problems if problem not in ("new scenario", "not run")]
+        regressed = regressed or bool(blocking)
+        print(f"{name:<22}{base_p95:>10}{p95:>10}{change:>9}{base_statements:>16}{statements:>11}  "
+              f"{'; '.join(problems) or 'ok'}")
+
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main_cli()
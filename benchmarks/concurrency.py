@@ -0,0 +1,114 @@
+"""
+Concurrent-request throughput benchmark.
+
+Compares the old request path (blocking Session calls made directly inside an
+``async def`` endpoint, on the event loop) with the current one (sync endpoints
+run in the bounded worker threadpool configured by ``DB_THREADPOOL_SIZE``).
+
+Per-statement latency is injected through an engine event so the effect of a
+slow database is visible even against a local server:
+
+    python -m benchmarks.concurrency --requests 400 --concurrency 40 --latency-ms 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import event
+
+import database
+import main
+from benchmarks.asgi import ASGIDriver
+
+BLOCKING_PATH = "/__benchmark__/blocking/questions/{qid}"
+
+
+@main.app.get(BLOCKING_PATH, include_in_schema=False)
+async def blocking_get_question(qid: int):
+    # The pre-threadpool behaviour: sync Session work on the event loop
+    db = database.SessionLocal()
+    try:
+        question = db.query(main.models.QuestionModel).filter(
+            main.models.QuestionModel.question_id == qid
+        ).first()
+        return {"found": question is not None}
+    finally:
+        db.close()
+
+
+def inject_latency(latency_ms):
+    """
+    Sleep before every statement to emulate a slow or distant database
+    """
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(latency_ms / 1000.0)
+
+    event.listen(database.engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def run_mode(driver, path, total, concurrency):
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(path)
+
+    async def worker():
+        while not queue.empty():
+            request_path = queue.get_nowait()
+            started = time.perf_counter()
+            status, _, _ = await driver.request("GET", request_path)
+            latencies.append(time.perf_counter() - started)
+            if status >= 500:
+                raise RuntimeError(f"{request_path} returned {status}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "elapsed": elapsed,
+        "throughput": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+async def run(args):
+    driver = ASGIDriver(main.app)
+    modes = {
+        "blocking (async def + sync Session)": BLOCKING_PATH.format(qid=args.qid),
+        "threadpool (def endpoints)": f"/questions/{args.qid}",
+    }
+    results = {}
+    async with driver.lifespan():
+        for name, path in modes.items():
+            # Warm up the connection pool before measuring
+            await run_mode(driver, path, args.concurrency, args.concurrency)
+            results[name] = await run_mode(driver, path, args.requests, args.concurrency)
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--qid", type=int, default=1, help="question id to fetch (a miss is fine)")
+    args = parser.parse_args()
+
+    if args.latency_ms > 0:
+        inject_latency(args.latency_ms)
+
+    results = asyncio.run(run(args))
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, "
+          f"+{args.latency_ms:g} ms per statement, threadpool size {database.DB_THREADPOOL_SIZE}")
+    print(f"{'mode':<40}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, result in results.items():
+        print(f"{name:<40}{result['throughput']:>10.1f}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,215 @@
+"""
+Synthetic data generator for the benchmarks.
+
+Fills userbase, question_master, template_metadata, template_definition,
+sfr_users and audit_details of the configured database (DATABASE_URL, e.g.
+sqlite:///benchmark.db, or the MySQL settings in .env) to the given scale.
+Rows are deterministic for a given --seed and are written with batched
+multi-row INSERTs:
+
+    DATABASE_URL=sqlite:///benchmark.db python -m benchmarks.generate --scale small
+    python -m benchmarks.generate --questions 1000000 --audit-rows 50000000
+
+The target tables must be empty; --reset drops and recreates every table first.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert
+
+import database
+import models
+from main import ORDER_GAP
+
+# Named scales; individual flags override them
+SCALES = {
+    "small": {"users": 1000, "questions": 20000, "templates": 500, "audit_rows": 100000},
+    "medium": {"users": 20000, "questions": 200000, "templates": 5000, "audit_rows": 2000000},
+    "large": {"users": 100000, "questions": 1000000, "templates": 20000, "audit_rows": 50000000},
+}
+
+PHASES = [f"Phase {number}" for number in range(1, 9)]
+SECTIONS = [f"Section {letter}" for letter in "ABCDEFGHIJKLMNOP"]
+ANSWER_TYPES = ["text", "yes_no", "multiple_choice", "rating", "date", "number"]
+TEMPLATE_TYPES = ["assessment", "survey", "checklist", "audit", "review"]
+ACCESS_TYPES = ["editor", "user"]
+ENTITY_ACTIONS = [("QUESTION", "CREATE"), ("QUESTION", "UPDATE"), ("QUESTION", "DELETE"),
+                  ("TEMPLATE", "CREATE"), ("TEMPLATE", "UPDATE"), ("USER", "UPDATE")]
+
+# Vocabulary for question text, so search has realistic term frequencies
+WORDS = ("process control risk review policy access data system manage report incident "
+         "vendor training backup recovery change approval document record retention security "
+         "network password account privilege audit evidence owner schedule frequency monitor "
+         "alert escalate response customer contract compliance quality safety inventory asset "
+         "license update patch vulnerability encryption transfer storage disposal").split()
+
+TABLES = [
+    models.UserModel,
+    models.QuestionModel,
+    models.TemplateModel,
+    models.TemplateDefinitionModel,
+    models.TemplateAccessModel,
+    models.AuditDetailsModel,
+]
+
+
+def sentence(rng, low, high):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def write_rows(connection, model, rows, batch_size):
+    """
+    Insert rows from a generator in batches, committing after each batch
+    """
+    started = time.perf_counter()
+    written = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            connection.execute(insert(model), batch)
+            connection.commit()
+            written += len(batch)
+            batch = []
+            print(f"\r  {model.__tablename__}: {written:,}", end="", flush=True)
+    if batch:
+        connection.execute(insert(model), batch)
+        connection.commit()
+        written += len(batch)
+    elapsed = time.perf_counter() - started
+    print(f"\r  {model.__tablename__}: {written:,} rows in {elapsed:.1f}s ({written / max(elapsed, 1e-9):,.0f} rows/s)")
+    return written
+
+
+def users(count):
+    for user_id in range(1, count + 1):
+        yield {
+            "user_id": user_id,
+            "username": f"user{user_id:07d}",
+            "email": f"user{user_id:07d}@example.com",
+            "password_hash": "$2b$10$benchmarkbenchmarkbenchmarkbenchmarkbenchmarkbenchm",
+        }
+
+
+def questions(rng, count, user_count):
+    for question_id in range(1, count + 1):
+        yield {
+            "question_id": question_id,
+            "context": sentence(rng, 8, 30),
+            "question": sentence(rng, 5, 15).capitalize() + "?",
+            "phase": rng.choice(PHASES),
+            "section": rng.choice(SECTIONS),
+            "answer_type": rng.choice(ANSWER_TYPES),
+            "created_by": rng.randint(1, user_count),
+        }
+
+
+def templates(rng, count, user_count):
+    for template_id in range(1, count + 1):
+        yield {
+            "template_id": template_id,
+            "name": f"Template {template_id}: {sentence(rng, 2, 4)}",
+            "purpose": sentence(rng, 5, 20),
+            "type": rng.choice(TEMPLATE_TYPES),
+            "created_by": rng.randint(1, user_count),
+        }
+
+
+def template_questions(rng, template_count, question_count, per_template):
+    for template_id in range(1, template_count + 1):
+        size = min(question_count, rng.randint(per_template // 2, per_template * 3 // 2))
+        for index, question_id in enumerate(rng.sample(range(1, question_count + 1), size)):
+            yield {"template_id": template_id, "question_id": question_id, "order": (index + 1) * ORDER_GAP}
+
+
+def access_grants(rng, template_count, user_count, per_template, administrators):
+    # Global roles: a few administrators, the rest get the computed default
+    for user_id in range(1, min(administrators, user_count) + 1):
+        yield {"template_id": None, "user_id": user_id, "access_type": "administrator"}
+    for template_id in range(1, template_count + 1):
+        size = min(user_count, rng.randint(0, per_template * 2))
+        for user_id in rng.sample(range(1, user_count + 1), size):
+            yield {"template_id": template_id, "user_id": user_id, "access_type": rng.choice(ACCESS_TYPES)}
+
+
+def audit_rows(rng, count, user_count, question_count, template_count, days):
+    # Spread evenly over the period, oldest first, like a real insert order
+    start = datetime.now() - timedelta(days=days)
+    step = timedelta(days=days) / max(count, 1)
+    for index in range(count):
+        entity_type, action_type = rng.choice(ENTITY_ACTIONS)
+        upper = {"QUESTION": question_count, "TEMPLATE": template_count, "USER": user_count}[entity_type]
+        yield {
+            "user_id": rng.randint(1, user_count),
+            "action_type": action_type,
+            "entity_type": entity_type,
+            "entity_id": rng.randint(1, max(upper, 1)),
+            "old_values": json.dumps({"value": rng.randint(0, 1000)}) if action_type != "CREATE" else None,
+            "new_values": json.dumps({"value": rng.randint(0, 1000)}) if action_type != "DELETE" else None,
+            "ip_address": f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+            "user_agent": "benchmark",
+            "created_at": start + step * index,
+        }
+
+
+def prepare_tables(connection, reset):
+    if reset:
+        models.Base.metadata.drop_all(bind=connection)
+    models.Base.metadata.create_all(bind=connection)
+    connection.commit()
+    for model in TABLES:
+        count = connection.execute(func.count().select().select_from(model.__table__)).scalar()
+        if count:
+            raise SystemExit(f"{model.__tablename__} already has {count:,} rows; use --reset to start over")
+
+
+def generate(args):
+    rng = random.Random(args.seed)
+    with database.engine.connect() as connection:
+        if connection.dialect.name == "sqlite":
+            # Bulk load settings; the database file is disposable
+            connection.exec_driver_sql("PRAGMA journal_mode=WAL")
+            connection.exec_driver_sql("PRAGMA synchronous=OFF")
+        prepare_tables(connection, args.reset)
+
+        print(f"Generating into {database.engine.url.render_as_string(hide_password=True)}")
+        started = time.perf_counter()
+        write_rows(connection, models.UserModel, users(args.users), args.batch_size)
+        write_rows(connection, models.QuestionModel, questions(rng, args.questions, args.users), args.batch_size)
+        write_rows(connection, models.TemplateModel, templates(rng, args.templates, args.users), args.batch_size)
+        write_rows(connection, models.TemplateDefinitionModel,
+                   template_questions(rng, args.templates, args.questions, args.questions_per_template), args.batch_size)
+        write_rows(connection, models.TemplateAccessModel,
+                   access_grants(rng, args.templates, args.users, args.grants_per_template, args.administrators), args.batch_size)
+        write_rows(connection, models.AuditDetailsModel,
+                   audit_rows(rng, args.audit_rows, args.users, args.questions, args.templates, args.audit_days), args.batch_size)
+        print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--questions", type=int)
+    parser.add_argument("--templates", type=int)
+    parser.add_argument("--audit-rows", type=int)
+    parser.add_argument("--questions-per-template", type=int, default=50)
+    parser.add_argument("--grants-per-template", type=int, default=5)
+    parser.add_argument("--administrators", type=int, default=5)
+    parser.add_argument("--audit-days", type=int, default=365)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    args = parser.parse_args(argv)
+    for key, value in SCALES[args.scale].items():
+        if getattr(args, key) is None:
+            setattr(args, key, value)
+    return args
+
+
+if __name__ == "__main__":
+    generate(parse_args(sys.argv[1:]))
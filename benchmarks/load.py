@@ -0,0 +1,228 @@
+"""
+Read-path load benchmark.
+
+Drives a fixed mix of scenarios against the app in process (no sockets) on the
+database configured by DATABASE_URL or .env, usually one filled by
+benchmarks.generate. Ids are sampled from the database first, so every run
+with the same --seed issues the same requests. Each scenario runs on its own
+for --requests requests at --concurrency, and statements and database time
+are read from the Server-Timing header of every response. The mean statement
+count depends on cache hits; max_statements is the cost of a miss.
+
+    DATABASE_URL=sqlite:///benchmark.db python -m benchmarks.load --output results.json
+    python -m benchmarks.compare benchmarks/baselines/sqlite-small.json results.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import re
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import sqlalchemy
+from sqlalchemy import func
+
+import database
+import main
+import models
+from benchmarks.asgi import ASGIDriver
+from benchmarks.generate import PHASES, SECTIONS, WORDS
+
+SAMPLE_SIZE = 1000
+
+_SERVER_TIMING_DB_RE = re.compile(r'db;dur=([\d.]+);desc="(\d+) statements')
+
+
+def sample_ids(db, column, rng, size=SAMPLE_SIZE):
+    """
+    Up to size ids spread over the whole table
+    """
+    lowest, highest = db.query(func.min(column), func.max(column)).one()
+    if lowest is None:
+        return []
+    return [rng.randint(lowest, highest) for _ in range(size)]
+
+
+def load_fixtures(rng):
+    db = database.SessionLocal()
+    try:
+        fixtures = {
+            "question_ids": sample_ids(db, models.QuestionModel.question_id, rng),
+            "template_ids": sample_ids(db, models.TemplateModel.template_id, rng),
+            "user_ids": sample_ids(db, models.UserModel.user_id, rng),
+            "usernames": [username for (username,) in db.query(models.UserModel.username).limit(SAMPLE_SIZE)],
+            "questions": db.query(func.count(models.QuestionModel.question_id)).scalar(),
+            "audit_rows": db.query(func.count(models.AuditDetailsModel.audit_id)).scalar(),
+        }
+    finally:
+        db.close()
+    if not fixtures["question_ids"] or not fixtures["template_ids"] or not fixtures["user_ids"]:
+        raise SystemExit("The database is empty; fill it with python -m benchmarks.generate first")
+    return fixtures
+
+
+# Scenario name -> function(rng, fixtures) returning (method, path, params, json body)
+SCENARIOS = {
+    "question": lambda rng, f: ("GET", f"/questions/{rng.choice(f['question_ids'])}", None, None),
+    "question list": lambda rng, f: ("GET", "/questions", {
+        "phase": rng.choice(PHASES), "section": rng.choice(SECTIONS), "cursor": "", "limit": 50
+    }, None),
+    "question search": lambda rng, f: ("GET", "/questions/search", {
+        "q": " ".join(rng.sample(WORDS, 2)), "limit": 20
+    }, None),
+    "template detail": lambda rng, f: ("GET", f"/templates/{rng.choice(f['template_ids'])}", {
+        "include": "questions,access,creator"
+    }, None),
+    "template summaries": lambda rng, f: ("GET", "/templates", {"summary": "true", "cursor": "", "limit": 100}, None),
+    "user templates": lambda rng, f: ("GET", f"/users/{rng.choice(f['user_ids'])}/templates", {
+        "cursor": "", "limit": 50
+    }, None),
+    "users with roles": lambda rng, f: ("GET", "/users/roles", {
+        "q": rng.choice(f["usernames"])[:6], "cursor": "", "limit": 50
+    }, None),
+    "user lookup": lambda rng, f: ("GET", "/users/lookup", {"username": rng.choice(f["usernames"])}, None),
+    "audit page": lambda rng, f: ("GET", "/audit", {
+        "entity_type": "QUESTION", "entity_id": rng.choice(f["question_ids"]), "cursor": "", "limit": 50
+    }, None),
+}
+
+# Opt-in, since they change the database
+WRITE_SCENARIOS = {
+    "audit insert": lambda rng, f: ("POST", "/audit", None, {
+        "user_id": rng.choice(f["user_ids"]), "action_type": "UPDATE", "entity_type": "QUESTION",
+        "entity_id": rng.choice(f["question_ids"]), "new_values": "{}", "user_agent": "benchmark"
+    }),
+}
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_scenario(driver, build_request, rng, fixtures, total, concurrency):
+    requests = [build_request(rng, fixtures) for _ in range(total)]
+    latencies, statements, db_ms = [], [], []
+    errors = 0
+    queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            method, path, params, json_body = queue.get_nowait()
+            started = time.perf_counter()
+            status, headers, _ = await driver.request(method, path, params=params, json_body=json_body)
+            latencies.append(time.perf_counter() - started)
+            if status >= 400 and status != 404:
+                errors += 1
+            timing = dict(headers).get(b"server-timing")
+            match = _SERVER_TIMING_DB_RE.search(timing.decode()) if timing else None
+            if match:
+                db_ms.append(float(match.group(1)))
+                statements.append(int(match.group(2)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "statements": round(statistics.mean(statements), 2) if statements else None,
+        "max_statements": max(statements) if statements else None,
+        "db_ms": round(statistics.mean(db_ms), 3) if db_ms else None,
+    }
+
+
+async def wait_for_search_index(timeout):
+    # Searches answered from the SQL fallback would not be comparable
+    deadline = time.monotonic() + timeout
+    while main.question_index is not None and not main.question_index.ready:
+        if time.monotonic() > deadline:
+            raise SystemExit("The search index was not ready in time")
+        await asyncio.sleep(0.1)
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    fixtures = load_fixtures(rng)
+    scenarios = dict(SCENARIOS)
+    if args.writes:
+        scenarios.update(WRITE_SCENARIOS)
+    if args.scenario:
+        unknown = set(args.scenario) - set(scenarios)
+        if unknown:
+            raise SystemExit(f"Unknown scenarios: {sorted(unknown)}; choose from {sorted(scenarios)}")
+        scenarios = {name: scenarios[name] for name in args.scenario}
+
+    driver = ASGIDriver(main.app)
+    results = {}
+    async with driver.lifespan():
+        await wait_for_search_index(args.index_timeout)
+        for name, build_request in scenarios.items():
+            # Warm up connections and caches the way a running server would be
+            await run_scenario(driver, build_request, rng, fixtures, args.concurrency, args.concurrency)
+            results[name] = await run_scenario(driver, build_request, rng, fixtures, args.requests, args.concurrency)
+            print(f"  {name}: {results[name]['throughput']:.0f} req/s", file=sys.stderr)
+
+    return {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "database": database.engine.dialect.name,
+            "questions": fixtures["questions"],
+            "audit_rows": fixtures["audit_rows"],
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "threadpool": database.DB_THREADPOOL_SIZE,
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "machine": platform.machine(),
+        },
+        "scenarios": results,
+    }
+
+
+def print_results(report):
+    meta = report["meta"]
+    print(f"{meta['database']}: {meta['questions']:,} questions, {meta['audit_rows']:,} audit rows; "
+          f"{meta['requests']} requests per scenario at concurrency {meta['concurrency']}")
+    print(f"{'scenario':<22}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'stmts':>7}{'db ms':>8}{'errors':>8}")
+    for name, result in report["scenarios"].items():
+        statements = f"{result['statements']:.1f}" if result["statements"] is not None else "-"
+        db_ms = f"{result['db_ms']:.2f}" if result["db_ms"] is not None else "-"
+        print(f"{name:<22}{result['throughput']:>9.0f}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+              f"{result['p99_ms']:>9.2f}{statements:>7}{db_ms:>8}{result['errors']:>8}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scenario", action="append", help="run only this scenario (repeatable)")
+    parser.add_argument("--writes", action="store_true", help="include scenarios that write")
+    parser.add_argument("--index-timeout", type=float, default=300.0, help="seconds to wait for the search index")
+    parser.add_argument("--output", help="write the results as JSON, e.g. for benchmarks.compare")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_results(report)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+            output.write("\n")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,147 @@
+"""
+Template reordering benchmark.
+
+Builds a template from the first ``--size`` questions, then applies the same
+sequence of random single-question moves twice: once by resubmitting the whole
+list to POST /templates/{id}/questions (dense 1..n orders) and once through
+PUT /templates/{id}/questions/{qid}/position (sparse order keys). Reports
+statements, rows written and latency per move. The template is deleted again
+afterwards.
+
+    python -m benchmarks.template_ordering --size 2000 --moves 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from sqlalchemy import event
+
+import database
+import main
+import models
+from benchmarks.asgi import ASGIDriver
+
+
+class WriteCounter:
+    """
+    Count statements and rows written on the engine
+    """
+
+    def __init__(self, engine):
+        self.statements = 0
+        self.rows_written = 0
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+        if statement.lstrip()[:6].upper() in ("INSERT", "UPDATE", "DELETE") and cursor.rowcount > 0:
+            self.rows_written += cursor.rowcount
+
+    def snapshot(self):
+        return self.statements, self.rows_written
+
+
+def plan_moves(size, moves, seed):
+    """
+    Return [(question index, destination position)] applied in order
+    """
+    rng = random.Random(seed)
+    return [(rng.randrange(size), rng.randrange(size)) for _ in range(moves)]
+
+
+async def run_mode(driver, counter, template_id, question_ids, moves, use_move_endpoint):
+    order = list(question_ids)
+    latencies = []
+    statements_before, rows_before = counter.snapshot()
+
+    for source, destination in moves:
+        question_id = order.pop(source)
+        order.insert(destination, question_id)
+
+        started = time.perf_counter()
+        if use_move_endpoint:
+            status, _, body = await driver.request(
+                "PUT", f"/templates/{template_id}/questions/{question_id}/position",
+                json_body={"position": destination}
+            )
+        else:
+            status, _, body = await driver.request(
+                "POST", f"/templates/{template_id}/questions",
+                json_body=[{"question_id": qid, "order": index + 1} for index, qid in enumerate(order)]
+            )
+        latencies.append(time.perf_counter() - started)
+        if status >= 300:
+            raise RuntimeError(f"Move returned {status}: {body[:200]}")
+
+    statements_after, rows_after = counter.snapshot()
+    return {
+        "statements": (statements_after - statements_before) / len(moves),
+        "rows_written": (rows_after - rows_before) / len(moves),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "final_order": order,
+    }
+
+
+async def run(args):
+    db = database.SessionLocal()
+    try:
+        question_ids = [question_id for (question_id,) in db.query(models.QuestionModel.question_id)
+                        .order_by(models.QuestionModel.question_id).limit(args.size)]
+        user_id = db.query(models.UserModel.user_id).limit(1).scalar()
+    finally:
+        db.close()
+    if len(question_ids) < args.size or user_id is None:
+        raise SystemExit(f"Need at least {args.size} questions and one user in the database")
+
+    driver = ASGIDriver(main.app)
+    counter = WriteCounter(database.engine)
+    moves = plan_moves(args.size, args.moves, args.seed)
+    results = {}
+
+    async with driver.lifespan():
+        for name, use_move_endpoint in (("full list (POST)", False), ("move (PUT position)", True)):
+            status, _, body = await driver.request("POST", "/templates", json_body={
+                "name": "benchmark ordering", "type": "benchmark", "created_by": user_id
+            })
+            template_id = json.loads(body)["template_id"] if status == 201 else None
+            if template_id is None:
+                raise RuntimeError(f"Creating the template returned {status}: {body[:200]}")
+            try:
+                await driver.request("POST", f"/templates/{template_id}/questions", json_body=[
+                    {"question_id": qid, "order": index + 1} for index, qid in enumerate(question_ids)
+                ])
+                result = await run_mode(driver, counter, template_id, question_ids, moves, use_move_endpoint)
+
+                # Both modes must end in the same order as the planned moves
+                _, _, body = await driver.request("GET", f"/templates/{template_id}/questions")
+                stored = [question["question_id"] for question in json.loads(body)]
+                if stored != result.pop("final_order"):
+                    raise RuntimeError(f"{name}: stored order does not match the applied moves")
+                results[name] = result
+            finally:
+                await driver.request("DELETE", f"/templates/{template_id}")
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1000, help="questions in the template")
+    parser.add_argument("--moves", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    print(f"{args.moves} random moves in a template of {args.size} questions")
+    print(f"{'mode':<24}{'stmts/move':>12}{'rows/move':>12}{'p50 ms':>10}{'max ms':>10}")
+    for name, result in results.items():
+        print(f"{name:<24}{result['statements']:>12.1f}{result['rows_written']:>12.1f}"
+              f"{result['p50_ms']:>10.1f}{result['max_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+
+
+class ResponseCache:
+    """
+    In-process LRU cache of serialized (JSON) responses with a TTL and a
+    bound on the total size of the cached bodies.
+
+    Every entry carries tags naming the entities it was built from, e.g.
+    "template:3" or "question:17". Mutating endpoints invalidate tags, which
+    drops exactly the entries built from the changed entity.
+    """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, ttl_seconds=CACHE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # Endpoints read and invalidate from worker threads
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (body, tags, expires_at)
+        self._tags = {}                # tag -> set of keys
+        self._bytes = 0
+        # Bumped by every invalidation; see set()
+        self.version = 0
+
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            body, _, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._drop(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return body
+
+    def set(self, key, body: bytes, tags=(), version=None):
+        """
+        Cache a response. Pass the ``version`` read before loading the data:
+        if anything was invalidated since, the data may predate that write
+        and is not cached.
+        """
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (body, tuple(tags), time.monotonic() + self.ttl_seconds)
+            self._bytes += len(body)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            # Evict least recently used entries until back under the bound
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, *tags):
+        """
+        Drop every entry carrying any of the given tags
+        """
+        with self._lock:
+            self.version += 1
+            for tag in tags:
+                for key in self._tags.get(tag, set()).copy():
+                    self._drop(key)
+                    self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    def _drop(self, key):
+        body, tags, _ = self._entries.pop(key)
+        self._bytes -= len(body)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+response_cache = ResponseCache() if CACHE_ENABLED else None
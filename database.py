@@ -1,9 +1,13 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 import os
 from dotenv import load_dotenv
 from urllib.parse import quote_plus
+from slow_queries import slow_query_log
+from pool import InstrumentedQueuePool, pool_autoscaler
 
 # # Load environment variables
 load_dotenv()
@@ -15,13 +19,104 @@ DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "3306")
 DB_NAME = os.getenv("DB_NAME", "tryfast")
 
+# "mysql" or "sqlite"; DATABASE_URL, if set, overrides both
+DB_BACKEND = os.getenv("DB_BACKEND", "mysql").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "surveymaster.db")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")  # NORMAL is durable enough under WAL
+SQLITE_CACHE_MB = int(os.getenv("SQLITE_CACHE_MB", "64"))
+
+# Connection pool settings (MySQL). DB_POOL_RECYCLE stays below the server's
+# wait_timeout so idle connections are replaced before MySQL drops them.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Worker threads that run the (sync) endpoints and their blocking Session calls
+# off the event loop. Keep it in line with the connection pool size + overflow.
+DB_THREADPOOL_SIZE = int(os.getenv("DB_THREADPOOL_SIZE", "15"))
+
+
+def database_url():
+    """
+    DATABASE_URL if set, otherwise the URL for DB_BACKEND
+    """
+    url = os.getenv("DATABASE_URL")
+    if url:
+        return url
+    if DB_BACKEND == "sqlite":
+        return f"sqlite:///{SQLITE_PATH}"
+    if DB_BACKEND != "mysql":
+        raise ValueError(f"DB_BACKEND must be 'mysql' or 'sqlite', not {DB_BACKEND!r}")
+    return f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+
+def create_db_engine(url):
+    """
+    Engine for url with the pool and connection settings of its backend
+    """
+    url = make_url(url)
+    if url.get_backend_name() != "sqlite":
+        return create_engine(
+            url,
+            poolclass=InstrumentedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+        )
+
+    # Sessions move between the event loop and worker threads, but a
+    # connection is only ever used by one thread at a time
+    connect_args = {"check_same_thread": False}
+    if url.database in (None, "", ":memory:"):
+        # Every connection would get its own empty in-memory database
+        return create_engine(url, connect_args=connect_args, poolclass=StaticPool)
+
+    # One pooled connection per worker thread, plus the event loop and
+    # background threads; SQLite serialises writers itself
+    engine = create_engine(
+        url,
+        connect_args=connect_args,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_THREADPOOL_SIZE + 2,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # Readers no longer block the writer and vice versa
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_MB * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        # MySQL enforces the foreign keys in models.py; SQLite only when asked
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    return engine
+
+
 # Create SQLAlchemy engine
-SQLALCHEMY_DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+SQLALCHEMY_DATABASE_URL = database_url()
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
+
+# Log statements slower than SLOW_QUERY_THRESHOLD_MS (see slow_queries.py)
+if slow_query_log is not None:
+    slow_query_log.instrument(engine)
+
+# Resize the pool from measured checkout waits (see pool.py)
+if pool_autoscaler is not None:
+    pool_autoscaler.instrument(engine)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Base class for models
 Base = declarative_base()
-
@@ -4,21 +4,29 @@ import {
   Container, Typography, Paper, Table, TableBody, TableCell, 
   TableContainer, TableHead, TableRow, Button, Box, 
   FormControl, InputLabel, Select, MenuItem, CircularProgress,
-  Dialog, DialogActions, DialogContent, DialogTitle
+  Dialog, DialogActions, DialogContent, DialogTitle, TextField, Checkbox
 } from '@mui/material';
 import { authServices } from '../services/api';
 import AuthContext from '../context/AuthContext';
 
+const USER_PAGE_SIZE = 50;
+
 const AdminPage = () => {
   const navigate = useNavigate();
   const { user } = useContext(AuthContext);
   const [users, setUsers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [searchQuery, setSearchQuery] = useState('');
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
   
   // Dialog state
   const [dialogOpen, setDialogOpen] = useState(false);
   const [selectedUser, setSelectedUser] = useState(null);
+  
+  // Users ticked for a bulk role change
+  const [selectedIds, setSelectedIds] = useState([]);
   const [newRole, setNewRole] = useState('');
 
   useEffect(() => {
@@ -30,21 +38,34 @@ const AdminPage = () => {
       return;
     }
     
-    fetchUsers();
-  }, [navigate, user]);
+    // Re-run the search shortly after the admin stops typing
+    const timer = setTimeout(() => fetchUsers(), 300);
+    return () => clearTimeout(timer);
+  }, [navigate, user, searchQuery]);
 
-  const fetchUsers = async () => {
-    setLoading(true);
+  // Users matching the search, one page at a time
+  const fetchUsers = async (cursor = '') => {
+    if (cursor) {
+      setLoadingMore(true);
+    } else {
+      setLoading(true);
+    }
     setError(null);
     
     try {
-      const data = await authServices.getUsers();
-      setUsers(data);
+      const page = await authServices.getUsers({
+        q: searchQuery || null,
+        cursor,
+        limit: USER_PAGE_SIZE
+      });
+      setUsers(prev => (cursor ? [...prev, ...page.items] : page.items));
+      setNextCursor(page.next_cursor);
     } catch (err) {
       console.error('Failed to fetch users:', err);
       setError('Failed to load users. Please try again later.');
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -54,6 +75,18 @@ const AdminPage = () => {
     setDialogOpen(true);
   };
 
+  const handleOpenBulkDialog = () => {
+    setSelectedUser(null);
+    setNewRole('user');
+    setDialogOpen(true);
+  };
+
+  const handleToggleSelected = (userId) => {
+    setSelectedIds(prev => (
+      prev.includes(userId) ? prev.filter(id => id !== userId) : [...prev, userId]
+    ));
+  };
+
   const handleCloseDialog = () => {
     setDialogOpen(false);
     setSelectedUser(null);
@@ -64,7 +97,10 @@ const AdminPage = () => {
   };
 
   const handleUpdateRole = async () => {
-    if (!selectedUser) return;
+    if (!selectedUser) {
+      await handleUpdateSelectedRoles();
+      return;
+    }
     
     try {
       await authServices.updateUserRole(selectedUser.user_id, newRole);
@@ -78,12 +114,51 @@ const AdminPage = () => {
     }
   };
 
+  // Assign the chosen role to every ticked user in one request
+  const handleUpdateSelectedRoles = async () => {
+    try {
+      const results = await authServices.updateUserRoles(
+        selectedIds.map(userId => ({ user_id: userId, access_type: newRole }))
+      );
+      const assigned = new Set(
+        results.filter(r => r.outcome !== 'user_not_found').map(r => r.user_id)
+      );
+      setUsers(users.map(u => 
+        assigned.has(u.user_id) ? { ...u, access_type: newRole } : u
+      ));
+      setSelectedIds([]);
+      handleCloseDialog();
+    } catch (err) {
+      console.error('Failed to update user roles:', err);
+      setError('Failed to update user roles. Please try again later.');
+    }
+  };
+
   return (
     <Container maxWidth="lg" sx={{ mt: 4, mb: 4 }}>
       <Typography variant="h4" component="h1" gutterBottom>
         User Management
       </Typography>
       
+      <TextField
+        fullWidth
+        label="Search by username or email"
+        variant="outlined"
+        value={searchQuery}
+        onChange={(e) => setSearchQuery(e.target.value)}
+        sx={{ mb: 2 }}
+      />
+      
+      <Box display="flex" justifyContent="flex-end" mb={2}>
+        <Button 
+          variant="contained" 
+          disabled={selectedIds.length === 0}
+          onClick={handleOpenBulkDialog}
+        >
+          Change Role of Selected ({selectedIds.length})
+        </Button>
+      </Box>
+      
       {loading ? (
         <Box display="flex" justifyContent="center" my={4}>
           <CircularProgress />
@@ -97,6 +172,7 @@ const AdminPage = () => {
           <Table>
             <TableHead>
               <TableRow>
+                <TableCell padding="checkbox" />
                 <TableCell>ID</TableCell>
                 <TableCell>Username</TableCell>
                 <TableCell>Email</TableCell>
@@ -107,13 +183,19 @@ const AdminPage = () => {
             <TableBody>
               {users.length === 0 ? (
                 <TableRow>
-                  <TableCell colSpan={5} align="center">
+                  <TableCell colSpan={6} align="center">
                     No users found
                   </TableCell>
                 </TableRow>
               ) : (
                 users.map((user) => (
                   <TableRow key={user.user_id}>
+                    <TableCell padding="checkbox">
+                      <Checkbox
+                        checked={selectedIds.includes(user.user_id)}
+                        onChange={() => handleToggleSelected(user.user_id)}
+                      />
+                    </TableCell>
                     <TableCell>{user.user_id}</TableCell>
                     <TableCell>{user.username}</TableCell>
                     <TableCell>{user.email}</TableCell>
@@ -132,6 +214,13 @@ const AdminPage = () => {
               )}
             </TableBody>
           </Table>
+          {nextCursor && (
+            <Box display="flex" justifyContent="center" p={2}>
+              <Button onClick={() => fetchUsers(nextCursor)} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </Button>
+            </Box>
+          )}
         </TableContainer>
       )}
       
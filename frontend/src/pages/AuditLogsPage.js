@@ -23,6 +23,8 @@ const AuditLogsPage = () => {
   // Pagination and filtering
   const [page, setPage] = useState(0);
   const [rowsPerPage, setRowsPerPage] = useState(10);
+  // cursors[n] is the cursor that fetches page n ('' is the first page)
+  const [cursors, setCursors] = useState(['']);
   const [filters, setFilters] = useState({
     user_id: '',
     entity_type: '',
@@ -41,14 +43,14 @@ const AuditLogsPage = () => {
     fetchAuditLogs();
   }, [navigate, user, page, rowsPerPage]);
 
-  const fetchAuditLogs = async () => {
+  const fetchAuditLogs = async (pageIndex = page, cursor = cursors[pageIndex] ?? '') => {
     setLoading(true);
     setError(null);
     
     try {
       // Prepare query parameters
       const params = {
-        skip: page * rowsPerPage,
+        cursor,
         limit: rowsPerPage,
         ...Object.fromEntries(
           Object.entries(filters).filter(([_, value]) => value !== '')
@@ -56,7 +58,16 @@ const AuditLogsPage = () => {
       };
       
       const data = await auditServices.getAuditLogs(params);
-      setAuditLogs(data);
+      setAuditLogs(data.items);
+      
+      // Remember where the next page starts
+      setCursors(prev => {
+        const next = prev.slice(0, pageIndex + 1);
+        if (data.next_cursor) {
+          next[pageIndex + 1] = data.next_cursor;
+        }
+        return next;
+      });
     } catch (err) {
       console.error('Failed to fetch audit logs:', err);
       setError('Failed to load audit logs. Please try again later.');
@@ -66,11 +77,16 @@ const AuditLogsPage = () => {
   };
 
   const handleChangePage = (event, newPage) => {
+    // Only pages reached through a cursor can be opened
+    if (cursors[newPage] === undefined) {
+      return;
+    }
     setPage(newPage);
   };
 
   const handleChangeRowsPerPage = (event) => {
     setRowsPerPage(parseInt(event.target.value, 10));
+    setCursors(['']);
     setPage(0);
   };
 
@@ -83,8 +99,9 @@ const AuditLogsPage = () => {
   };
 
   const applyFilters = () => {
+    setCursors(['']);
     setPage(0);
-    fetchAuditLogs();
+    fetchAuditLogs(0, '');
   };
 
   const resetFilters = () => {
@@ -93,8 +110,9 @@ const AuditLogsPage = () => {
       entity_type: '',
       action_type: '',
     });
+    setCursors(['']);
     setPage(0);
-    fetchAuditLogs();
+    fetchAuditLogs(0, '');
   };
 
   // Format datetime to a readable string
@@ -14,6 +14,40 @@ import {
 import { templateServices, questionServices } from '../services/api';
 import { DragDropContext, Droppable, Draggable } from 'react-beautiful-dnd';
 
+const QUESTION_PAGE_SIZE = 50;
+
+// If after is before with exactly one id moved, return that move as
+// { questionId, position, afterQuestionId } (afterQuestionId null: moved first); otherwise null
+const findSingleMove = (before, after) => {
+  if (before.length !== after.length) {
+    return null;
+  }
+  let first = 0;
+  while (first < before.length && before[first] === after[first]) {
+    first++;
+  }
+  if (first === before.length) {
+    return null;
+  }
+  let last = before.length - 1;
+  while (before[last] === after[last]) {
+    last--;
+  }
+  
+  const movedDown = [...before];
+  movedDown.splice(last, 0, movedDown.splice(first, 1)[0]);
+  if (movedDown.every((questionId, index) => questionId === after[index])) {
+    return { questionId: before[first], position: last, afterQuestionId: after[last - 1] };
+  }
+  
+  const movedUp = [...before];
+  movedUp.splice(first, 0, movedUp.splice(last, 1)[0]);
+  if (movedUp.every((questionId, index) => questionId === after[index])) {
+    return { questionId: before[last], position: first, afterQuestionId: first > 0 ? after[first - 1] : null };
+  }
+  return null;
+};
+
 const TemplateQuestionsPage = () => {
   const { id } = useParams();
   const navigate = useNavigate();
@@ -22,6 +56,8 @@ const TemplateQuestionsPage = () => {
   const [template, setTemplate] = useState(null);
   const [questions, setQuestions] = useState([]);
   const [availableQuestions, setAvailableQuestions] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [searching, setSearching] = useState(false);
   const [loading, setLoading] = useState(true);
   const [saving, setSaving] = useState(false);
   const [error, setError] = useState(null);
@@ -32,6 +68,9 @@ const TemplateQuestionsPage = () => {
   const [searchQuery, setSearchQuery] = useState('');
   const [selectedQuestions, setSelectedQuestions] = useState([]);
   
+  // Question ids as last loaded from the server, to detect single moves on save
+  const [savedQuestionIds, setSavedQuestionIds] = useState([]);
+  
   useEffect(() => {
     const fetchData = async () => {
       try {
@@ -42,10 +81,7 @@ const TemplateQuestionsPage = () => {
         // Fetch template questions
         const templateQuestions = await templateServices.getTemplateQuestions(id);
         setQuestions(templateQuestions || []);
-        
-        // Fetch all available questions
-        const allQuestions = await questionServices.getAllQuestions();
-        setAvailableQuestions(allQuestions || []);
+        setSavedQuestionIds((templateQuestions || []).map(q => q.question_id));
         
         setError(null);
       } catch (err) {
@@ -59,6 +95,34 @@ const TemplateQuestionsPage = () => {
     fetchData();
   }, [id]);
   
+  // Search questions on the server, one page at a time
+  const fetchAvailableQuestions = async (query, cursor = '') => {
+    setSearching(true);
+    try {
+      const page = await questionServices.getQuestions({
+        q: query || null,
+        cursor,
+        limit: QUESTION_PAGE_SIZE
+      });
+      setAvailableQuestions(prev => (cursor ? [...prev, ...page.items] : page.items));
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      console.error('Error searching questions:', err);
+      setError('Failed to load questions. Please try again later.');
+    } finally {
+      setSearching(false);
+    }
+  };
+  
+  // Re-run the search shortly after the user stops typing
+  useEffect(() => {
+    if (!addDialogOpen) {
+      return;
+    }
+    const timer = setTimeout(() => fetchAvailableQuestions(searchQuery), 300);
+    return () => clearTimeout(timer);
+  }, [addDialogOpen, searchQuery]);
+  
   const handleOpenAddDialog = () => {
     setAddDialogOpen(true);
     setSearchQuery('');
@@ -73,20 +137,20 @@ const TemplateQuestionsPage = () => {
     setSearchQuery(e.target.value);
   };
   
-  const handleQuestionSelect = (questionId) => {
+  // Selected questions are kept as objects so they survive a new search
+  const handleQuestionSelect = (question) => {
     setSelectedQuestions(prev => {
-      if (prev.includes(questionId)) {
-        return prev.filter(id => id !== questionId);
+      if (prev.some(q => q.question_id === question.question_id)) {
+        return prev.filter(q => q.question_id !== question.question_id);
       } else {
-        return [...prev, questionId];
+        return [...prev, question];
       }
     });
   };
   
   const handleAddQuestions = () => {
     // Get the selected questions and add them to the template questions
-    const newQuestions = availableQuestions
-      .filter(q => selectedQuestions.includes(q.question_id))
+    const newQuestions = selectedQuestions
       .filter(q => !questions.some(tq => tq.question_id === q.question_id)); // Filter out already added questions
     
     // Add to the end of the list
@@ -135,14 +199,21 @@ const TemplateQuestionsPage = () => {
     setSaving(true);
     
     try {
-      // Map questions to template questions format
-      const templateQuestions = questions.map((question, index) => ({
-        question_id: question.question_id,
-        order: index + 1
-      }));
+      const move = findSingleMove(savedQuestionIds, questions.map(q => q.question_id));
       
-      // Save to API
-      await templateServices.addQuestionsToTemplate(id, templateQuestions);
+      if (move) {
+        // Only one question changed place; move just that one
+        await templateServices.moveTemplateQuestion(id, move.questionId, move.afterQuestionId);
+      } else {
+        // Map questions to template questions format
+        const templateQuestions = questions.map((question, index) => ({
+          question_id: question.question_id,
+          order: index + 1
+        }));
+        
+        // Save to API
+        await templateServices.addQuestionsToTemplate(id, templateQuestions);
+      }
       
       setSuccess(true);
       setError(null);
@@ -164,19 +235,10 @@ const TemplateQuestionsPage = () => {
     navigate(`/templates/view/${id}`);
   };
   
-  const filteredAvailableQuestions = availableQuestions.filter(q => {
-    // Filter out questions already in the template
-    const isAlreadyAdded = questions.some(tq => tq.question_id === q.question_id);
-    
-    // Filter by search query
-    const matchesSearch = searchQuery === '' ||
-      q.question.toLowerCase().includes(searchQuery.toLowerCase()) ||
-      q.context.toLowerCase().includes(searchQuery.toLowerCase()) ||
-      q.phase.toLowerCase().includes(searchQuery.toLowerCase()) ||
-      q.section.toLowerCase().includes(searchQuery.toLowerCase());
-    
-    return !isAlreadyAdded && matchesSearch;
-  });
+  // The search itself runs on the server; only hide questions already in the template
+  const filteredAvailableQuestions = availableQuestions.filter(
+    q => !questions.some(tq => tq.question_id === q.question_id)
+  );
   
   if (loading) {
     return (
@@ -368,7 +430,7 @@ const TemplateQuestionsPage = () => {
             />
           </Box>
           
-          {filteredAvailableQuestions.length === 0 ? (
+          {filteredAvailableQuestions.length === 0 && !searching ? (
             <Typography sx={{ textAlign: 'center', py: 4 }}>
               No matching questions found.
             </Typography>
@@ -381,8 +443,8 @@ const TemplateQuestionsPage = () => {
                       <ListItemIcon>
                         <Checkbox
                           edge="start"
-                          checked={selectedQuestions.includes(question.question_id)}
-                          onChange={() => handleQuestionSelect(question.question_id)}
+                          checked={selectedQuestions.some(q => q.question_id === question.question_id)}
+                          onChange={() => handleQuestionSelect(question)}
                         />
                       </ListItemIcon>
                       <ListItemText
@@ -401,6 +463,16 @@ const TemplateQuestionsPage = () => {
                   </React.Fragment>
                 ))}
               </List>
+              {nextCursor && (
+                <Box sx={{ display: 'flex', justifyContent: 'center', py: 1 }}>
+                  <Button
+                    onClick={() => fetchAvailableQuestions(searchQuery, nextCursor)}
+                    disabled={searching}
+                  >
+                    {searching ? 'Loading...' : 'Load more'}
+                  </Button>
+                </Box>
+              )}
             </Paper>
           )}
         </DialogContent>
@@ -5,13 +5,17 @@ import {
   TableRow, IconButton, Box, Dialog, DialogTitle, 
   DialogContent, DialogContentText, DialogActions
 } from '@mui/material';
-import { Edit, Delete, Visibility, Add } from '@mui/icons-material';
+import { Edit, Delete, Visibility, Add, ContentCopy } from '@mui/icons-material';
 import { useNavigate } from 'react-router-dom';
 import { templateServices } from '../services/api';
 
+const TEMPLATE_PAGE_SIZE = 100;
+
 const TemplatesPage = () => {
   const [templates, setTemplates] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
   const [deleteDialogOpen, setDeleteDialogOpen] = useState(false);
   const [templateToDelete, setTemplateToDelete] = useState(null);
@@ -22,17 +26,27 @@ const TemplatesPage = () => {
     fetchTemplates();
   }, []);
   
-  const fetchTemplates = async () => {
-    setLoading(true);
+  // Templates with their question and access counts, one page at a time
+  const fetchTemplates = async (cursor = '') => {
+    if (cursor) {
+      setLoadingMore(true);
+    } else {
+      setLoading(true);
+    }
     try {
-      const data = await templateServices.getAllTemplates();
-      setTemplates(data);
+      const page = await templateServices.getTemplateSummaries({
+        cursor,
+        limit: TEMPLATE_PAGE_SIZE
+      });
+      setTemplates(prev => (cursor ? [...prev, ...page.items] : page.items));
+      setNextCursor(page.next_cursor);
       setError(null);
     } catch (err) {
       console.error('Error fetching templates:', err);
       setError('Failed to load templates. Please try again later.');
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
   
@@ -52,6 +66,20 @@ const TemplatesPage = () => {
     navigate(`/templates/view/${template.template_id}`);
   };
   
+  const handleClone = async (template) => {
+    try {
+      const clone = await templateServices.cloneTemplate(template.template_id);
+      setTemplates([...templates, {
+        ...clone,
+        question_count: template.question_count,
+        access_count: template.access_count
+      }]);
+    } catch (err) {
+      console.error('Error cloning template:', err);
+      setError('Failed to clone template. Please try again later.');
+    }
+  };
+  
   const handleDeleteClick = (template) => {
     setTemplateToDelete(template);
     setDeleteDialogOpen(true);
@@ -136,6 +164,8 @@ const TemplatesPage = () => {
                   <TableCell>Name</TableCell>
                   <TableCell>Purpose</TableCell>
                   <TableCell>Type</TableCell>
+                  <TableCell align="right">Questions</TableCell>
+                  <TableCell align="right">Shared With</TableCell>
                   <TableCell align="right">Actions</TableCell>
                 </TableRow>
               </TableHead>
@@ -145,6 +175,8 @@ const TemplatesPage = () => {
                     <TableCell>{template.name}</TableCell>
                     <TableCell>{template.purpose}</TableCell>
                     <TableCell>{template.type}</TableCell>
+                    <TableCell align="right">{template.question_count}</TableCell>
+                    <TableCell align="right">{template.access_count}</TableCell>
                     <TableCell align="right">
                       <IconButton 
                         color="info" 
@@ -160,6 +192,13 @@ const TemplatesPage = () => {
                       >
                         <Edit />
                       </IconButton>
+                      <IconButton 
+                        color="primary" 
+                        aria-label="clone template"
+                        onClick={() => handleClone(template)}
+                      >
+                        <ContentCopy />
+                      </IconButton>
                       <IconButton 
                         color="error" 
                         aria-label="delete template"
@@ -173,6 +212,13 @@ const TemplatesPage = () => {
               </TableBody>
             </Table>
           </TableContainer>
+          {nextCursor && (
+            <Box sx={{ display: 'flex', justifyContent: 'center', p: 2 }}>
+              <Button onClick={() => fetchTemplates(nextCursor)} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </Button>
+            </Box>
+          )}
         </Paper>
       )}
       
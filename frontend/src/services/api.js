@@ -40,9 +40,17 @@ export const authServices = {
       throw error.response ? error.response.data : new Error('Registration failed');
     }
   },
-  getUsers: async () => {
+  // Users with their roles; pass { q, cursor, limit } for a page ({ items, next_cursor })
+  getUsers: async (params = {}) => {
     try {
-      const response = await api.get('/user-roles');
+      const queryParams = new URLSearchParams();
+      Object.entries(params).forEach(([key, value]) => {
+        if (value !== null && value !== undefined) {
+          queryParams.append(key, value);
+        }
+      });
+      
+      const response = await api.get(`/user-roles?${queryParams.toString()}`);
       return response.data;
     } catch (error) {
       throw error.response ? error.response.data : new Error('Failed to fetch users');
@@ -56,6 +64,31 @@ export const authServices = {
       throw error.response ? error.response.data : new Error('Failed to update user role');
     }
   },
+  // Templates the user can access, cursor-paginated ({ items, next_cursor })
+  getUserTemplates: async (userId, params = {}) => {
+    try {
+      const queryParams = new URLSearchParams();
+      Object.entries(params).forEach(([key, value]) => {
+        if (value !== null && value !== undefined) {
+          queryParams.append(key, value);
+        }
+      });
+      
+      const response = await api.get(`/users/${userId}/templates?${queryParams.toString()}`);
+      return response.data;
+    } catch (error) {
+      throw error.response ? error.response.data : new Error('Failed to fetch user templates');
+    }
+  },
+  // assignments: [{ user_id, access_type }]; returns a per-user outcome
+  updateUserRoles: async (assignments) => {
+    try {
+      const response = await api.post('/user-roles/bulk', assignments);
+      return response.data;
+    } catch (error) {
+      throw error.response ? error.response.data : new Error('Failed to update user roles');
+    }
+  },
   updateUser: async (userId, userData) => {
     try {
       const response = await api.put(`/users/${userId}`, userData);
@@ -77,6 +110,23 @@ export const questionServices = {
     }
   },
   
+  // Filtered, sorted and cursor-paginated questions ({ items, next_cursor })
+  getQuestions: async (params = {}) => {
+    try {
+      const queryParams = new URLSearchParams();
+      Object.entries(params).forEach(([key, value]) => {
+        if (value !== null && value !== undefined) {
+          queryParams.append(key, value);
+        }
+      });
+      
+      const response = await api.get(`/questions?${queryParams.toString()}`);
+      return response.data;
+    } catch (error) {
+      throw error.response ? error.response.data : new Error('Failed to fetch questions');
+    }
+  },
+  
   getQuestionById: async (id) => {
     try {
       const response = await api.get(`/questions/${id}`);
@@ -133,6 +183,22 @@ export const questionServices = {
 
 // Template services
 export const templateServices = {
+  getTemplateSummaries: async (params = {}) => {
+    try {
+      const queryParams = new URLSearchParams({ summary: true });
+      Object.entries(params).forEach(([key, value]) => {
+        if (value !== null && value !== undefined) {
+          queryParams.append(key, value);
+        }
+      });
+      
+      const response = await api.get(`/templates?${queryParams.toString()}`);
+      return response.data;
+    } catch (error) {
+      throw error.response ? error.response.data : new Error('Failed to fetch templates');
+    }
+  },
+  
   getAllTemplates: async () => {
     try {
       const response = await api.get('/templates');
@@ -183,6 +249,15 @@ export const templateServices = {
     }
   },
   
+  cloneTemplate: async (id, cloneData = {}) => {
+    try {
+      const response = await api.post(`/templates/${id}/clone`, cloneData);
+      return response.data;
+    } catch (error) {
+      throw error.response ? error.response.data : new Error('Failed to clone template');
+    }
+  },
+  
   getTemplateQuestions: async (id) => {
     try {
       const response = await api.get(`/templates/${id}/questions`);
@@ -201,6 +276,17 @@ export const templateServices = {
     }
   },
   
+  moveTemplateQuestion: async (templateId, questionId, afterQuestionId) => {
+    try {
+      const response = await api.put(`/templates/${templateId}/questions/${questionId}/position`, {
+        after_question_id: afterQuestionId
+      });
+      return response.data;
+    } catch (error) {
+      throw error.response ? error.response.data : new Error('Failed to move question');
+    }
+  },
+  
   removeQuestionFromTemplate: async (templateId, questionId) => {
     try {
       const response = await api.delete(`/templates/${templateId}/questions/${questionId}`);
@@ -15,18 +15,64 @@
 #     init_db() 
 
 
-from fastapi import FastAPI, HTTPException, Depends, status, Request
-from pydantic import BaseModel, field_validator
-from typing import Annotated, List, Optional
+from fastapi import FastAPI, HTTPException, Depends, status, Request, Response
+from pydantic import BaseModel, TypeAdapter, field_validator
+from typing import Annotated, List, Optional, Union
 import models
-from database import engine, SessionLocal
+from database import engine, SessionLocal, DB_THREADPOOL_SIZE
+from audit_queue import audit_writer
+from search import question_index
+from cache import response_cache
+from metrics import pool_metrics, request_metrics
+from pool import pool_autoscaler
+from slow_queries import request_scope, slow_query_log
+from sqlalchemy import and_, or_, case, delete, func, insert, literal, select, update
+from sqlalchemy.dialects import mysql, sqlite
 from sqlalchemy.orm import Session
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from datetime import datetime
 import json
+import base64
+import bisect
+import asyncio
+from contextlib import asynccontextmanager
+from anyio import CapacityLimiter, to_thread
 from pydantic import validator
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Endpoints are sync and run in the worker threadpool, so blocking
+    # database calls never stall the event loop. Bound that pool here; it is
+    # anyio's default limiter, so background work uses limiters of its own
+    # (see below and audit_queue.py) and never takes request capacity.
+    to_thread.current_default_thread_limiter().total_tokens = DB_THREADPOOL_SIZE
+    if audit_writer is not None:
+        await audit_writer.start()
+    if pool_autoscaler is not None:
+        await pool_autoscaler.start()
+    search_build = None
+    if question_index is not None:
+        # Load or build the search index without delaying startup
+        search_build = asyncio.create_task(to_thread.run_sync(
+            load_search_index, abandon_on_cancel=True, limiter=CapacityLimiter(1)
+        ))
+    yield
+    if search_build is not None and not search_build.done():
+        search_build.cancel()
+    if pool_autoscaler is not None:
+        await pool_autoscaler.stop()
+    if audit_writer is not None:
+        await audit_writer.stop()
+
+def load_search_index():
+    try:
+        result = question_index.load_or_rebuild()
+        print(f"Search index ready: {result['documents']} questions from {result['source']}")
+    except Exception as exc:
+        print(f"Search index build failed, search falls back to SQL: {exc}")
+
+app = FastAPI(lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -37,6 +83,33 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# Per-request timing, statement counts and the /metrics endpoint
+if request_metrics is not None:
+    request_metrics.instrument(engine)
+if pool_metrics is not None:
+    pool_metrics.instrument(engine)
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    # Lets the slow query log name the route a statement came from
+    scope_token = request_scope.set(request.scope)
+    try:
+        if request_metrics is None:
+            return await call_next(request)
+        token = request_metrics.start_request()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+        finally:
+            # Label by route template (/questions/{qid}), not by the raw path
+            route = request.scope.get("route")
+            stats = request_metrics.finish_request(token, request.method, route.path if route else "unmatched", status_code)
+        response.headers["Server-Timing"] = stats.server_timing()
+        return response
+    finally:
+        request_scope.reset(scope_token)
+
 models.Base.metadata.create_all(bind=engine)
 
 class QuestionModelBase(BaseModel):
@@ -76,6 +149,13 @@ class QuestionResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class QuestionSearchResult(QuestionResponse):
+    score: Optional[float] = None
+
+class QuestionPage(BaseModel):
+    items: List[QuestionResponse]
+    next_cursor: Optional[str] = None
+
 # Template models
 class TemplateBase(BaseModel):
     name: str
@@ -99,6 +179,11 @@ class TemplateResponse(TemplateBase):
     class Config:
         from_attributes = True
 
+class TemplateClone(BaseModel):
+    name: Optional[str] = None        # defaults to "<source name> (copy)"
+    created_by: Optional[int] = None  # defaults to the source template's creator
+    include_access: bool = True
+
 class TemplateAccessCreate(BaseModel):
     template_id: int
     user_id: int
@@ -110,6 +195,39 @@ class TemplateAccessResponse(TemplateAccessCreate):
     class Config:
         from_attributes = True
 
+class TemplatePage(BaseModel):
+    items: List[TemplateResponse]
+    next_cursor: Optional[str] = None
+
+class TemplateSummary(TemplateResponse):
+    question_count: int
+    access_count: int
+
+class TemplateSummaryPage(BaseModel):
+    items: List[TemplateSummary]
+    next_cursor: Optional[str] = None
+
+class UserWithRole(BaseModel):
+    user_id: int
+    username: str
+    email: str
+    access_type: str
+
+class UserWithRolePage(BaseModel):
+    items: List[UserWithRole]
+    next_cursor: Optional[str] = None
+
+class UserTemplate(TemplateResponse):
+    access_type: str  # the user's effective access to this template
+
+class UserTemplatePage(BaseModel):
+    items: List[UserTemplate]
+    next_cursor: Optional[str] = None
+
+class TemplateAccessGrant(BaseModel):
+    user_id: int
+    access_type: str
+
 class TemplateQuestionCreate(BaseModel):
     question_id: int
     order: int
@@ -123,12 +241,34 @@ class TemplateQuestionResponse(BaseModel):
     class Config:
         from_attributes = True
 
-class TemplateWithQuestions(TemplateResponse):
-    questions: List[QuestionResponse]
+class TemplateQuestionMove(BaseModel):
+    position: Optional[int] = None           # 0-based index in the template's question list
+    after_question_id: Optional[int] = None  # or the question to follow; null moves it to the front
+
+class UserSummary(BaseModel):
+    user_id: int
+    username: str
+    email: str
+    
+    class Config:
+        from_attributes = True
+
+class TemplateDetail(TemplateResponse):
+    # Only the parts named in GET /templates/{id}?include= are present
+    questions: Optional[List[QuestionResponse]] = None
+    access: Optional[List[TemplateAccessResponse]] = None
+    creator: Optional[UserSummary] = None
     
     class Config:
         from_attributes = True
 
+# Serializers for cached responses
+QUESTION_ADAPTER = TypeAdapter(QuestionResponse)
+TEMPLATE_LIST_ADAPTER = TypeAdapter(List[TemplateResponse])
+TEMPLATE_DETAIL_ADAPTER = TypeAdapter(TemplateDetail)
+TEMPLATE_SUMMARY_LIST_ADAPTER = TypeAdapter(List[TemplateSummary])
+TEMPLATE_SUMMARY_PAGE_ADAPTER = TypeAdapter(TemplateSummaryPage)
+
 # Dependency to get DB session
 def get_db():
     db = SessionLocal()
@@ -139,23 +279,221 @@ def get_db():
 
 db_dependency = Annotated[Session, Depends(get_db)]
 
+# Helper function to load a template's questions
+def load_template_questions(db: Session, template_id: int):
+    """
+    Load the questions of a template in template order with a single joined query
+    """
+    return db.query(models.QuestionModel).join(
+        models.TemplateDefinitionModel,
+        models.TemplateDefinitionModel.question_id == models.QuestionModel.question_id
+    ).filter(
+        models.TemplateDefinitionModel.template_id == template_id
+    ).order_by(models.TemplateDefinitionModel.order).all()
+
+# Helper functions for opaque keyset pagination cursors
+def encode_cursor(*values) -> str:
+    """
+    Encode the sort position of the last row on a page
+    """
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+# Helper functions for the response cache
+def cached_json(key):
+    """
+    Return (cached response or None, cache version to pass to store_json on a miss)
+    """
+    if response_cache is None:
+        return None, None
+    body = response_cache.get(key)
+    if body is not None:
+        return Response(content=body, media_type="application/json"), None
+    return None, response_cache.version
+
+def store_json(key, adapter: TypeAdapter, data, tags, version, exclude_unset=False):
+    """
+    Serialize data with its response model, cache it under key and return it
+    """
+    body = adapter.dump_json(adapter.validate_python(data, from_attributes=True), exclude_unset=exclude_unset)
+    if response_cache is not None:
+        response_cache.set(key, body, tags=tags, version=version)
+    return Response(content=body, media_type="application/json")
+
+def json_response(adapter: TypeAdapter, data):
+    """
+    Serialize data with its response model, without caching it
+    """
+    return Response(content=adapter.dump_json(adapter.validate_python(data, from_attributes=True)), media_type="application/json")
+
+def invalidate_cache(*tags):
+    if response_cache is not None:
+        response_cache.invalidate(*tags)
+
 @app.post("/users/", status_code=status.HTTP_201_CREATED)
-async def create_user(user: UserModelBase, db: db_dependency):
+def create_user(user: UserModelBase, db: db_dependency):
     db_user = models.UserModel(**user.dict())
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
     return db_user
 
+@app.get("/users/lookup", status_code=status.HTTP_200_OK)
+def lookup_user(db: db_dependency, email: Optional[str] = None, username: Optional[str] = None):
+    if email is None and username is None:
+        raise HTTPException(status_code=400, detail="Either email or username is required")
+    
+    # Resolve the user and its global role in one query on the unique indexes
+    query = db.query(models.UserModel, models.TemplateAccessModel.access_type).outerjoin(
+        models.TemplateAccessModel,
+        and_(
+            models.TemplateAccessModel.user_id == models.UserModel.user_id,
+            models.TemplateAccessModel.template_id == None  # Using NULL for global roles
+        )
+    )
+    if email is not None:
+        query = query.filter(models.UserModel.email == email)
+    if username is not None:
+        query = query.filter(models.UserModel.username == username)
+    
+    row = query.first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    user, access_type = row
+    return {
+        "user_id": user.user_id,
+        "username": user.username,
+        "email": user.email,
+        "password_hash": user.password_hash,
+        "access_type": access_type or models.DEFAULT_ACCESS_TYPE
+    }
+
+@app.get("/users/roles", status_code=status.HTTP_200_OK, response_model=Union[List[UserWithRole], UserWithRolePage])
+def get_users_with_roles(
+    db: db_dependency,
+    q: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+):
+    """
+    Users with their global role (the default role if none is stored), ordered
+    by user_id. q matches a prefix of the username or email.
+    """
+    query = db.query(
+        models.UserModel.user_id,
+        models.UserModel.username,
+        models.UserModel.email,
+        func.coalesce(models.TemplateAccessModel.access_type, models.DEFAULT_ACCESS_TYPE).label("access_type")
+    ).outerjoin(
+        models.TemplateAccessModel,
+        and_(
+            models.TemplateAccessModel.user_id == models.UserModel.user_id,
+            models.TemplateAccessModel.template_id == None  # Using NULL for global roles
+        )
+    )
+    if q:
+        # Prefix matches can use the unique username and email indexes
+        query = query.filter(or_(
+            models.UserModel.username.startswith(q, autoescape=True),
+            models.UserModel.email.startswith(q, autoescape=True)
+        ))
+    query = query.order_by(models.UserModel.user_id)
+    
+    # Without a cursor the endpoint returns a plain list
+    if cursor is None:
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+    
+    # Cursor mode: seek past the last user_id seen. An empty cursor is page 1.
+    limit = 100 if limit is None else limit
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 1 or not isinstance(values[0], int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(models.UserModel.user_id > values[0])
+    
+    users = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(users[limit - 1].user_id) if len(users) > limit else None
+    return {"items": users[:limit], "next_cursor": next_cursor}
+
 @app.get("/users/{user_id}", status_code=status.HTTP_200_OK)
-async def get_user(user_id: int, db: db_dependency):
+def get_user(user_id: int, db: db_dependency):
     user = db.query(models.UserModel).filter(models.UserModel.user_id == user_id).first()
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
+@app.get("/users/{user_id}/templates", status_code=status.HTTP_200_OK, response_model=Union[List[UserTemplate], UserTemplatePage])
+def get_user_templates(user_id: int, db: db_dependency, cursor: Optional[str] = None, limit: Optional[int] = None):
+    """
+    Templates the user can access: every template for a global administrator,
+    otherwise the templates with a grant for the user in sfr_users. Ordered by
+    template_id.
+    """
+    # Verify user exists and get the global role in the same query
+    row = db.query(models.UserModel.user_id, models.TemplateAccessModel.access_type).outerjoin(
+        models.TemplateAccessModel,
+        and_(
+            models.TemplateAccessModel.user_id == models.UserModel.user_id,
+            models.TemplateAccessModel.template_id == None  # Using NULL for global roles
+        )
+    ).filter(models.UserModel.user_id == user_id).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    if row.access_type == "administrator":
+        # Walk template_metadata by primary key
+        query = db.query(models.TemplateModel, literal("administrator"))
+        id_column = models.TemplateModel.template_id
+    else:
+        # Walk the user's grants on the (user_id, template_id) index
+        query = db.query(models.TemplateModel, models.TemplateAccessModel.access_type).join(
+            models.TemplateAccessModel,
+            models.TemplateAccessModel.template_id == models.TemplateModel.template_id
+        ).filter(models.TemplateAccessModel.user_id == user_id)
+        id_column = models.TemplateAccessModel.template_id
+    query = query.order_by(id_column)
+    
+    def with_access(rows):
+        return [
+            {**{field: getattr(template, field) for field in TemplateResponse.model_fields}, "access_type": access_type}
+            for template, access_type in rows
+        ]
+    
+    # Without a cursor the endpoint returns a plain list
+    if cursor is None:
+        if limit is not None:
+            query = query.limit(limit)
+        return with_access(query.all())
+    
+    # Cursor mode: seek past the last template_id seen. An empty cursor is page 1.
+    limit = 100 if limit is None else limit
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 1 or not isinstance(values[0], int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(id_column > values[0])
+    
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1][0].template_id) if len(rows) > limit else None
+    return {"items": with_access(rows[:limit]), "next_cursor": next_cursor}
+
 @app.get("/users", status_code=status.HTTP_200_OK)
-async def get_users(db: db_dependency):
+def get_users(db: db_dependency):
     users = db.query(models.UserModel).all()
     if users is None:
         raise HTTPException(status_code=404, detail="Users not found")
@@ -170,14 +508,13 @@ async def get_users(db: db_dependency):
     return user_list
 
 @app.post("/questions/", status_code=status.HTTP_201_CREATED, response_model=QuestionResponse)
-async def add_question(question: QuestionModelBase, request: Request, db: db_dependency):
+def add_question(question: QuestionModelBase, request: Request, db: db_dependency):
     db_question = models.QuestionModel(**question.dict())
     db.add(db_question)
-    db.commit()
-    db.refresh(db_question)
+    db.flush()  # Assigns the id used by the audit entry
     
-    # Create audit entry
-    await create_audit_entry(
+    # Create audit entry in the same transaction
+    create_audit_entry(
         db=db,
         user_id=question.created_by,
         action_type="CREATE",
@@ -187,18 +524,22 @@ async def add_question(question: QuestionModelBase, request: Request, db: db_dep
         ip_address=request.client.host,
         user_agent=request.headers.get("user-agent", "")
     )
+    db.commit()
+    db.refresh(db_question)
+    
+    if question_index is not None:
+        question_index.add(db_question)
     
     return db_question
 
 @app.post("/questions/add", status_code=status.HTTP_201_CREATED, response_model=QuestionResponse)
-async def add_question(question: QuestionUpdateModel, request: Request, db: db_dependency):
+def add_question(question: QuestionUpdateModel, request: Request, db: db_dependency):
     db_question = models.QuestionModel(**question.dict())
     db.add(db_question)
-    db.commit()
-    db.refresh(db_question)
+    db.flush()  # Assigns the id used by the audit entry
     
-    # Create audit entry
-    await create_audit_entry(
+    # Create audit entry in the same transaction
+    create_audit_entry(
         db=db,
         user_id=question.created_by,
         action_type="CREATE",
@@ -208,23 +549,166 @@ async def add_question(question: QuestionUpdateModel, request: Request, db: db_d
         ip_address=request.client.host,
         user_agent=request.headers.get("user-agent", "")
     )
+    db.commit()
+    db.refresh(db_question)
+    
+    if question_index is not None:
+        question_index.add(db_question)
     
     return db_question
 
+@app.get("/questions/search", status_code=status.HTTP_200_OK, response_model=List[QuestionSearchResult])
+def search_questions(q: str, db: db_dependency, limit: int = 20):
+    # Until the index is loaded, answer from SQL so search keeps working
+    if question_index is None or not question_index.ready:
+        questions = filter_question_query(db.query(models.QuestionModel), q=q).limit(limit).all()
+        return [QuestionSearchResult.model_validate(question) for question in questions]
+    
+    hits = question_index.search(q, limit=limit)
+    if not hits:
+        return []
+    
+    # Fetch the ranked questions in one primary-key lookup and keep the ranking
+    questions = {
+        question.question_id: question
+        for question in db.query(models.QuestionModel).filter(
+            models.QuestionModel.question_id.in_([question_id for question_id, _ in hits])
+        ).all()
+    }
+    return [
+        QuestionSearchResult.model_validate(questions[question_id]).model_copy(update={"score": score})
+        for question_id, score in hits
+        if question_id in questions
+    ]
+
+@app.post("/questions/search/rebuild", status_code=status.HTTP_200_OK)
+def rebuild_search_index():
+    if question_index is None:
+        raise HTTPException(status_code=404, detail="Search index is disabled")
+    result = question_index.rebuild()
+    return {**result, **question_index.stats()}
+
 @app.get("/questions/{qid}", status_code=status.HTTP_200_OK, response_model=QuestionResponse)
-async def get_question(qid: int, db: db_dependency):
+def get_question(qid: int, db: db_dependency):
+    cached, version = cached_json(("question", qid))
+    if cached is not None:
+        return cached
+    
     question = db.query(models.QuestionModel).filter(models.QuestionModel.question_id == qid).first()
     if question is None:
         raise HTTPException(status_code=404, detail="Question not found")
-    return question
+    return store_json(("question", qid), QUESTION_ADAPTER, question, [f"question:{qid}"], version)
 
-@app.get("/questions", status_code=status.HTTP_200_OK, response_model=List[QuestionResponse])
-async def get_all_questions(db: db_dependency):
-    questions = db.query(models.QuestionModel).all()
-    return questions
+# Columns GET /questions can sort by; prefix with "-" for descending
+# Sortable columns and the type of their values in a cursor
+QUESTION_SORT_KEYS = {"question_id": int, "phase": str, "section": str, "answer_type": str, "created_by": int}
+
+def question_sort_key(sort: str) -> str:
+    """
+    Column name of a sort parameter; a single leading "-" means descending
+    """
+    return sort[1:] if sort.startswith("-") else sort
+
+def decode_question_cursor(cursor: str):
+    values = decode_cursor(cursor)
+    if len(values) != 3:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    cursor_sort, last_value, last_id = values
+    value_type = QUESTION_SORT_KEYS.get(question_sort_key(cursor_sort)) if isinstance(cursor_sort, str) else None
+    # type() rather than isinstance() so JSON true/false are not taken for ints
+    if value_type is None or type(last_value) is not value_type or type(last_id) is not int:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def filter_question_query(query, phase=None, section=None, answer_type=None, created_by=None, q=None):
+    """
+    Apply the GET /questions filters; exact-match filters use the question_master indexes
+    """
+    if phase:
+        query = query.filter(models.QuestionModel.phase == phase)
+    if section:
+        query = query.filter(models.QuestionModel.section == section)
+    if answer_type:
+        query = query.filter(models.QuestionModel.answer_type == answer_type)
+    if created_by:
+        query = query.filter(models.QuestionModel.created_by == created_by)
+    if q:
+        query = query.filter(or_(
+            models.QuestionModel.question.icontains(q, autoescape=True),
+            models.QuestionModel.context.icontains(q, autoescape=True),
+            models.QuestionModel.phase.icontains(q, autoescape=True),
+            models.QuestionModel.section.icontains(q, autoescape=True)
+        ))
+    return query
+
+@app.get("/questions", status_code=status.HTTP_200_OK, response_model=Union[List[QuestionResponse], QuestionPage])
+def get_all_questions(
+    db: db_dependency,
+    phase: Optional[str] = None,
+    section: Optional[str] = None,
+    answer_type: Optional[str] = None,
+    created_by: Optional[int] = None,
+    q: Optional[str] = None,
+    sort: str = "question_id",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+):
+    sort_key = question_sort_key(sort)
+    if sort_key not in QUESTION_SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {sorted(QUESTION_SORT_KEYS)}")
+    descending = sort.startswith("-")
+    sort_column = getattr(models.QuestionModel, sort_key)
+    id_column = models.QuestionModel.question_id
+    
+    query = filter_question_query(
+        db.query(models.QuestionModel),
+        phase=phase,
+        section=section,
+        answer_type=answer_type,
+        created_by=created_by,
+        q=q
+    )
+    
+    # question_id breaks ties so the order (and the cursor) is total
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+    
+    # Without a cursor the endpoint keeps returning a plain list
+    if cursor is None:
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+    
+    # Cursor mode: seek past the last (sort value, question_id) seen. An empty cursor is page 1.
+    limit = 100 if limit is None else limit
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    if cursor:
+        cursor_sort, last_value, last_id = decode_question_cursor(cursor)
+        if cursor_sort != sort:
+            raise HTTPException(status_code=400, detail="Cursor was issued for a different sort")
+        if descending:
+            query = query.filter(or_(
+                sort_column < last_value,
+                and_(sort_column == last_value, id_column < last_id)
+            ))
+        else:
+            query = query.filter(or_(
+                sort_column > last_value,
+                and_(sort_column == last_value, id_column > last_id)
+            ))
+    
+    questions = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(questions) > limit:
+        last = questions[limit - 1]
+        next_cursor = encode_cursor(sort, getattr(last, sort_key), last.question_id)
+    return {"items": questions[:limit], "next_cursor": next_cursor}
 
 @app.put("/questions/{qid}", status_code=status.HTTP_200_OK, response_model=QuestionResponse)
-async def update_question(qid: int, question: QuestionUpdateModel, request: Request, db: db_dependency):
+def update_question(qid: int, question: QuestionUpdateModel, request: Request, db: db_dependency):
     db_question = db.query(models.QuestionModel).filter(models.QuestionModel.question_id == qid).first()
     if db_question is None:
         raise HTTPException(status_code=404, detail="Question not found")
@@ -244,11 +728,8 @@ async def update_question(qid: int, question: QuestionUpdateModel, request: Requ
     for key, value in question_data.items():
         setattr(db_question, key, value)
     
-    db.commit()
-    db.refresh(db_question)
-    
-    # Create audit entry
-    await create_audit_entry(
+    # Create audit entry in the same transaction
+    create_audit_entry(
         db=db,
         user_id=db_question.created_by,
         action_type="UPDATE",
@@ -259,11 +740,17 @@ async def update_question(qid: int, question: QuestionUpdateModel, request: Requ
         ip_address=request.client.host,
         user_agent=request.headers.get("user-agent", "")
     )
+    db.commit()
+    db.refresh(db_question)
+    invalidate_cache(f"question:{qid}")
+    
+    if question_index is not None:
+        question_index.add(db_question)
     
     return db_question
 
 @app.delete("/questions/{qid}", status_code=status.HTTP_200_OK)
-async def delete_question(qid: int, request: Request, db: db_dependency):
+def delete_question(qid: int, request: Request, db: db_dependency):
     db_question = db.query(models.QuestionModel).filter(models.QuestionModel.question_id == qid).first()
     if db_question is None:
         raise HTTPException(status_code=404, detail="Question not found")
@@ -281,10 +768,9 @@ async def delete_question(qid: int, request: Request, db: db_dependency):
     user_id = db_question.created_by
     
     db.delete(db_question)
-    db.commit()
     
-    # Create audit entry
-    await create_audit_entry(
+    # Create audit entry in the same transaction
+    create_audit_entry(
         db=db,
         user_id=user_id,
         action_type="DELETE",
@@ -294,20 +780,24 @@ async def delete_question(qid: int, request: Request, db: db_dependency):
         ip_address=request.client.host,
         user_agent=request.headers.get("user-agent", "")
     )
+    db.commit()
+    invalidate_cache(f"question:{qid}")
+    
+    if question_index is not None:
+        question_index.remove(qid)
     
     return {"message": "Question deleted successfully"}
 
 # Template endpoints
 @app.post("/templates", status_code=status.HTTP_201_CREATED, response_model=TemplateResponse)
-async def create_template(template: TemplateCreate, request: Request, db: db_dependency):
+def create_template(template: TemplateCreate, request: Request, db: db_dependency):
     # Create the template
     db_template = models.TemplateModel(**template.dict())
     db.add(db_template)
-    db.commit()
-    db.refresh(db_template)
+    db.flush()  # Assigns the id used by the audit entry
     
-    # Create audit entry
-    await create_audit_entry(
+    # Create audit entry in the same transaction
+    create_audit_entry(
         db=db,
         user_id=template.created_by,
         action_type="CREATE",
@@ -317,34 +807,127 @@ async def create_template(template: TemplateCreate, request: Request, db: db_dep
         ip_address=request.client.host,
         user_agent=request.headers.get("user-agent", "")
     )
+    db.commit()
+    db.refresh(db_template)
+    invalidate_cache("templates")
     
     return db_template
 
-@app.get("/templates", status_code=status.HTTP_200_OK, response_model=List[TemplateResponse])
-async def get_all_templates(db: db_dependency):
-    templates = db.query(models.TemplateModel).all()
-    return templates
+@app.get("/templates", status_code=status.HTTP_200_OK, response_model=Union[List[TemplateResponse], TemplatePage, List[TemplateSummary], TemplateSummaryPage])
+def get_all_templates(
+    db: db_dependency,
+    summary: bool = False,
+    type: Optional[str] = None,
+    created_by: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+):
+    """
+    List templates, optionally filtered by type and creator. With summary=true
+    every template also carries its question and access counts, computed in
+    the same query.
+    """
+    unfiltered = type is None and created_by is None and cursor is None and limit is None
+    if unfiltered and not summary:
+        cached, version = cached_json(("templates",))
+        if cached is not None:
+            return cached
+    
+    columns = [models.TemplateModel]
+    if summary:
+        # Correlated counts resolve through the (template_id, ...) unique
+        # indexes; joining both tables would multiply their rows
+        columns += [
+            select(func.count(models.TemplateDefinitionModel.id))
+            .where(models.TemplateDefinitionModel.template_id == models.TemplateModel.template_id)
+            .correlate(models.TemplateModel)
+            .scalar_subquery()
+            .label("question_count"),
+            select(func.count(models.TemplateAccessModel.id))
+            .where(models.TemplateAccessModel.template_id == models.TemplateModel.template_id)
+            .correlate(models.TemplateModel)
+            .scalar_subquery()
+            .label("access_count"),
+        ]
+    query = db.query(*columns)
+    if type is not None:
+        query = query.filter(models.TemplateModel.type == type)
+    if created_by is not None:
+        query = query.filter(models.TemplateModel.created_by == created_by)
+    query = query.order_by(models.TemplateModel.template_id)
+    
+    def summarize(rows):
+        return [
+            {
+                **{field: getattr(template, field) for field in TemplateResponse.model_fields},
+                "question_count": question_count,
+                "access_count": access_count
+            }
+            for template, question_count, access_count in rows
+        ]
+    
+    # Without a cursor the endpoint keeps returning a plain list
+    if cursor is None:
+        if limit is not None:
+            query = query.limit(limit)
+        if summary:
+            return json_response(TEMPLATE_SUMMARY_LIST_ADAPTER, summarize(query.all()))
+        if unfiltered:
+            return store_json(("templates",), TEMPLATE_LIST_ADAPTER, query.all(), ["templates"], version)
+        return query.all()
+    
+    # Cursor mode: seek past the last template_id seen. An empty cursor is page 1.
+    limit = 100 if limit is None else limit
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 1 or not isinstance(values[0], int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(models.TemplateModel.template_id > values[0])
+    
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor((last[0] if summary else last).template_id)
+    if summary:
+        return json_response(TEMPLATE_SUMMARY_PAGE_ADAPTER, {"items": summarize(rows[:limit]), "next_cursor": next_cursor})
+    return {"items": rows[:limit], "next_cursor": next_cursor}
 
-@app.get("/templates/{template_id}", status_code=status.HTTP_200_OK, response_model=TemplateWithQuestions)
-async def get_template(template_id: int, db: db_dependency):
-    template = db.query(models.TemplateModel).filter(models.TemplateModel.template_id == template_id).first()
+TEMPLATE_INCLUDES = ("questions", "access", "creator")
+
+@app.get("/templates/{template_id}", status_code=status.HTTP_200_OK, response_model=TemplateDetail, response_model_exclude_unset=True)
+def get_template(template_id: int, db: db_dependency, include: str = "questions"):
+    """
+    Template metadata plus the related data named in include, a comma-separated
+    subset of questions, access and creator. Each included part costs at most
+    one query; the creator is joined onto the template query.
+    """
+    includes = sorted({part.strip() for part in include.split(",") if part.strip()})
+    unknown = [part for part in includes if part not in TEMPLATE_INCLUDES]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown include: {', '.join(unknown)}; expected any of {', '.join(TEMPLATE_INCLUDES)}"
+        )
+    
+    cache_key = ("template", template_id, tuple(includes))
+    cached, version = cached_json(cache_key)
+    if cached is not None:
+        return cached
+    
+    creator = None
+    if "creator" in includes:
+        row = db.query(models.TemplateModel, models.UserModel).outerjoin(
+            models.UserModel, models.UserModel.user_id == models.TemplateModel.created_by
+        ).filter(models.TemplateModel.template_id == template_id).first()
+        template, creator = row if row is not None else (None, None)
+    else:
+        template = db.query(models.TemplateModel).filter(models.TemplateModel.template_id == template_id).first()
     if template is None:
         raise HTTPException(status_code=404, detail="Template not found")
     
-    # Get questions associated with this template
-    template_questions = db.query(models.TemplateDefinitionModel).filter(
-        models.TemplateDefinitionModel.template_id == template_id
-    ).order_by(models.TemplateDefinitionModel.order).all()
-    
-    # Get question details
-    questions = []
-    for tq in template_questions:
-        question = db.query(models.QuestionModel).filter(
-            models.QuestionModel.question_id == tq.question_id
-        ).first()
-        if question:
-            questions.append(question)
-    
     # Create response
     result = {
         "template_id": template.template_id,
@@ -353,14 +936,111 @@ async def get_template(template_id: int, db: db_dependency):
         "type": template.type,
         "created_by": template.created_by,
         "created_at": template.created_at.isoformat(),
-        "updated_at": template.updated_at.isoformat(),
-        "questions": questions
+        "updated_at": template.updated_at.isoformat()
     }
+    tags = [f"template:{template_id}"]
     
-    return result
+    if "questions" in includes:
+        result["questions"] = load_template_questions(db, template_id)
+        # The response embeds its questions, so edits to any of them invalidate it too
+        tags += [f"question:{question.question_id}" for question in result["questions"]]
+    
+    if "access" in includes:
+        result["access"] = db.query(models.TemplateAccessModel).filter(
+            models.TemplateAccessModel.template_id == template_id
+        ).order_by(models.TemplateAccessModel.id).all()
+        tags.append(f"template-access:{template_id}")
+    
+    if "creator" in includes:
+        result["creator"] = creator
+        tags.append(f"user:{template.created_by}")
+    
+    return store_json(cache_key, TEMPLATE_DETAIL_ADAPTER, result, tags, version, exclude_unset=True)
+
+@app.post("/templates/{template_id}/clone", status_code=status.HTTP_201_CREATED, response_model=TemplateResponse)
+def clone_template(template_id: int, clone: TemplateClone, request: Request, db: db_dependency):
+    """
+    Copy a template with its question list and, optionally, its access grants.
+    The rows are copied with INSERT ... SELECT, so the statement count does not
+    depend on the size of the template.
+    """
+    source = db.query(models.TemplateModel).filter(models.TemplateModel.template_id == template_id).first()
+    if source is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+    
+    max_name_length = models.TemplateModel.name.type.length
+    if clone.name and len(clone.name) > max_name_length:
+        raise HTTPException(status_code=400, detail=f"name must be at most {max_name_length} characters")
+    
+    # Verify the new owner exists
+    if clone.created_by is not None:
+        user = db.query(models.UserModel).filter(models.UserModel.user_id == clone.created_by).first()
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+    
+    db_template = models.TemplateModel(
+        name=clone.name or f"{source.name} (copy)"[:max_name_length],
+        purpose=source.purpose,
+        type=source.type,
+        created_by=clone.created_by if clone.created_by is not None else source.created_by
+    )
+    db.add(db_template)
+    db.flush()  # Assigns the id the copied rows point to
+    new_id = db_template.template_id
+    
+    # Copy the question list
+    questions_copied = db.execute(
+        insert(models.TemplateDefinitionModel).from_select(
+            ["template_id", "question_id", "order"],
+            select(
+                literal(new_id),
+                models.TemplateDefinitionModel.question_id,
+                models.TemplateDefinitionModel.order
+            ).where(models.TemplateDefinitionModel.template_id == template_id)
+        )
+    ).rowcount
+    
+    # Copy the access grants
+    access_copied = 0
+    if clone.include_access:
+        access_copied = db.execute(
+            insert(models.TemplateAccessModel).from_select(
+                ["template_id", "user_id", "access_type"],
+                select(
+                    literal(new_id),
+                    models.TemplateAccessModel.user_id,
+                    models.TemplateAccessModel.access_type
+                ).where(models.TemplateAccessModel.template_id == template_id)
+            )
+        ).rowcount
+    
+    # Create audit entry in the same transaction
+    create_audit_entry(
+        db=db,
+        user_id=db_template.created_by,
+        action_type="CREATE",
+        entity_type="TEMPLATE",
+        entity_id=new_id,
+        new_values={
+            "name": db_template.name,
+            "purpose": db_template.purpose,
+            "type": db_template.type,
+            "created_by": db_template.created_by,
+            "cloned_from": template_id,
+            "questions_copied": questions_copied,
+            "access_copied": access_copied
+        },
+        ip_address=request.client.host,
+        user_agent=request.headers.get("user-agent", "")
+    )
+    db.commit()
+    db.refresh(db_template)
+    invalidate_cache("templates")
+    
+    return db_template
 
 @app.put("/templates/{template_id}", status_code=status.HTTP_200_OK, response_model=TemplateResponse)
-async def update_template(template_id: int, template: TemplateUpdate, request: Request, db: db_dependency):
+def update_template(template_id: int, template: TemplateUpdate, request: Request, db: db_dependency):
     db_template = db.query(models.TemplateModel).filter(models.TemplateModel.template_id == template_id).first()
     if db_template is None:
         raise HTTPException(status_code=404, detail="Template not found")
@@ -377,11 +1057,8 @@ async def update_template(template_id: int, template: TemplateUpdate, request: R
     for key, value in template_data.items():
         setattr(db_template, key, value)
     
-    db.commit()
-    db.refresh(db_template)
-    
-    # Create audit entry
-    await create_audit_entry(
+    # Create audit entry in the same transaction
+    create_audit_entry(
         db=db,
         user_id=db_template.created_by,
         action_type="UPDATE",
@@ -392,11 +1069,14 @@ async def update_template(template_id: int, template: TemplateUpdate, request: R
         ip_address=request.client.host,
         user_agent=request.headers.get("user-agent", "")
     )
+    db.commit()
+    db.refresh(db_template)
+    invalidate_cache("templates", f"template:{template_id}")
     
     return db_template
 
 @app.delete("/templates/{template_id}", status_code=status.HTTP_200_OK)
-async def delete_template(template_id: int, request: Request, db: db_dependency):
+def delete_template(template_id: int, request: Request, db: db_dependency):
     db_template = db.query(models.TemplateModel).filter(models.TemplateModel.template_id == template_id).first()
     if db_template is None:
         raise HTTPException(status_code=404, detail="Template not found")
@@ -422,10 +1102,9 @@ async def delete_template(template_id: int, request: Request, db: db_dependency)
     
     # Delete the template
     db.delete(db_template)
-    db.commit()
     
-    # Create audit entry
-    await create_audit_entry(
+    # Create audit entry in the same transaction
+    create_audit_entry(
         db=db,
         user_id=user_id,
         action_type="DELETE",
@@ -435,12 +1114,14 @@ async def delete_template(template_id: int, request: Request, db: db_dependency)
         ip_address=request.client.host,
         user_agent=request.headers.get("user-agent", "")
     )
+    db.commit()
+    invalidate_cache("templates", f"template:{template_id}")
     
     return {"message": "Template deleted successfully"}
 
 # Template access (sfr_users) endpoints
 @app.post("/templates/{template_id}/access", status_code=status.HTTP_201_CREATED, response_model=TemplateAccessResponse)
-async def add_template_access(template_id: int, access: TemplateAccessCreate, db: db_dependency):
+def add_template_access(template_id: int, access: TemplateAccessCreate, db: db_dependency):
     # Verify template exists
     template = db.query(models.TemplateModel).filter(models.TemplateModel.template_id == template_id).first()
     if template is None:
@@ -461,10 +1142,65 @@ async def add_template_access(template_id: int, access: TemplateAccessCreate, db
     db.add(db_access)
     db.commit()
     db.refresh(db_access)
+    invalidate_cache(f"template-access:{template_id}")
     return db_access
 
+def upsert(db: Session, model, rows, key_columns, update_columns):
+    """
+    Multi-row INSERT that updates update_columns where a row with the same
+    key_columns (a unique constraint) already exists
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        statement = mysql.insert(model).values(rows)
+        return statement.on_duplicate_key_update({column: statement.inserted[column] for column in update_columns})
+    statement = sqlite.insert(model).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={column: statement.excluded[column] for column in update_columns}
+    )
+
+@app.post("/templates/{template_id}/access/bulk", status_code=status.HTTP_200_OK, response_model=List[TemplateAccessResponse])
+def add_template_access_bulk(template_id: int, grants: List[TemplateAccessGrant], db: db_dependency):
+    """
+    Grant or update access for many users at once: one query validates the
+    users, one multi-row upsert writes the grants and there is a single commit
+    """
+    # Verify template exists
+    template = db.query(models.TemplateModel).filter(models.TemplateModel.template_id == template_id).first()
+    if template is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+    
+    user_ids = [grant.user_id for grant in grants]
+    if len(set(user_ids)) != len(user_ids):
+        raise HTTPException(status_code=400, detail="Each user can only be granted access once per request")
+    
+    if grants:
+        # Verify all users exist
+        found = {user_id for (user_id,) in db.query(models.UserModel.user_id).filter(
+            models.UserModel.user_id.in_(user_ids)
+        )}
+        missing = [user_id for user_id in user_ids if user_id not in found]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"User with ID {missing[0]} not found")
+        
+        db.execute(upsert(
+            db,
+            models.TemplateAccessModel,
+            [{"template_id": template_id, "user_id": grant.user_id, "access_type": grant.access_type} for grant in grants],
+            key_columns=["template_id", "user_id"],
+            update_columns=["access_type"]
+        ))
+        db.commit()
+        invalidate_cache(f"template-access:{template_id}")
+    
+    return db.query(models.TemplateAccessModel).filter(
+        models.TemplateAccessModel.template_id == template_id,
+        models.TemplateAccessModel.user_id.in_(user_ids)
+    ).all() if grants else []
+
 @app.get("/templates/{template_id}/access", status_code=status.HTTP_200_OK, response_model=List[TemplateAccessResponse])
-async def get_template_access(template_id: int, db: db_dependency):
+def get_template_access(template_id: int, db: db_dependency):
     # Verify template exists
     template = db.query(models.TemplateModel).filter(models.TemplateModel.template_id == template_id).first()
     if template is None:
@@ -478,7 +1214,7 @@ async def get_template_access(template_id: int, db: db_dependency):
     return access_records
 
 @app.delete("/templates/{template_id}/access/{user_id}", status_code=status.HTTP_200_OK)
-async def remove_template_access(template_id: int, user_id: int, db: db_dependency):
+def remove_template_access(template_id: int, user_id: int, db: db_dependency):
     # Verify template exists
     template = db.query(models.TemplateModel).filter(models.TemplateModel.template_id == template_id).first()
     if template is None:
@@ -495,74 +1231,285 @@ async def remove_template_access(template_id: int, user_id: int, db: db_dependen
     
     db.delete(access_record)
     db.commit()
+    invalidate_cache(f"template-access:{template_id}")
     return {"message": "Access removed successfully"}
 
+# Spacing between template_definition order keys; a move takes the midpoint
+# of its new neighbours and the template is respread only when they touch
+ORDER_GAP = 1024
+
+def ranked_order_keys(keys):
+    """
+    Order keys for rows listed in their new sequence, given each row's current
+    key (None for rows not in the template yet). Rows on a longest increasing
+    run of current keys keep them and the others are spread over the gaps
+    between those; if a gap is too narrow every key is respread ORDER_GAP apart.
+    """
+    # Longest strictly increasing subsequence of the current keys (patience sorting)
+    tails, tail_indexes, previous = [], [], [None] * len(keys)
+    for index, key in enumerate(keys):
+        if key is None:
+            continue
+        slot = bisect.bisect_left(tails, key)
+        if slot == len(tails):
+            tails.append(key)
+            tail_indexes.append(index)
+        else:
+            tails[slot] = key
+            tail_indexes[slot] = index
+        previous[index] = tail_indexes[slot - 1] if slot else None
+    kept = set()
+    index = tail_indexes[-1] if tail_indexes else None
+    while index is not None:
+        kept.add(index)
+        index = previous[index]
+    
+    result = list(keys)
+    start, lower = 0, None
+    for index in range(len(keys) + 1):
+        if index < len(keys) and index not in kept:
+            continue
+        upper = keys[index] if index < len(keys) else None
+        count = index - start
+        if count:
+            if lower is None and upper is None:
+                run = [(offset + 1) * ORDER_GAP for offset in range(count)]
+            elif lower is None:
+                run = [upper - (count - offset) * ORDER_GAP for offset in range(count)]
+            elif upper is None:
+                run = [lower + (offset + 1) * ORDER_GAP for offset in range(count)]
+            else:
+                step = (upper - lower) // (count + 1)
+                if step < 1:
+                    return [(offset + 1) * ORDER_GAP for offset in range(len(keys))]
+                run = [lower + (offset + 1) * step for offset in range(count)]
+            result[start:index] = run
+        lower = upper
+        start = index + 1
+    return result
+
 # Template questions endpoints
 @app.post("/templates/{template_id}/questions", status_code=status.HTTP_201_CREATED, response_model=List[TemplateQuestionResponse])
-async def add_questions_to_template(template_id: int, questions: List[TemplateQuestionCreate], db: db_dependency):
+def add_questions_to_template(template_id: int, questions: List[TemplateQuestionCreate], db: db_dependency):
+    """
+    Make the template's question list match the payload. The submitted order
+    values only rank the questions: rows whose relative order is unchanged
+    keep their stored keys, so only added, removed and moved rows are written.
+    """
     # Verify template exists
     template = db.query(models.TemplateModel).filter(models.TemplateModel.template_id == template_id).first()
     if template is None:
         raise HTTPException(status_code=404, detail="Template not found")
     
-    # Clear existing questions if any
-    db.query(models.TemplateDefinitionModel).filter(
+    # Validate the payload and all question ids with one set-based query
+    requested = {}
+    for question_data in questions:
+        if question_data.question_id in requested:
+            raise HTTPException(status_code=400, detail=f"Question with ID {question_data.question_id} is listed more than once")
+        requested[question_data.question_id] = question_data.order
+    
+    existing_question_ids = {
+        question_id for (question_id,) in db.query(models.QuestionModel.question_id).filter(
+            models.QuestionModel.question_id.in_(requested)
+        )
+    } if requested else set()
+    for question_id in requested:
+        if question_id not in existing_question_ids:
+            raise HTTPException(status_code=404, detail=f"Question with ID {question_id} not found")
+    
+    # Diff the requested list against the current mapping
+    current = {
+        row.question_id: row
+        for row in db.query(
+            models.TemplateDefinitionModel.id,
+            models.TemplateDefinitionModel.question_id,
+            models.TemplateDefinitionModel.order
+        ).filter(models.TemplateDefinitionModel.template_id == template_id)
+    }
+    # Ties in the submitted order keep the payload's sequence
+    sequence = sorted(requested, key=requested.get)
+    orders = dict(zip(sequence, ranked_order_keys([
+        current[question_id].order if question_id in current else None for question_id in sequence
+    ])))
+    
+    to_delete = [row.id for question_id, row in current.items() if question_id not in requested]
+    to_insert = [
+        {"template_id": template_id, "question_id": question_id, "order": order}
+        for question_id, order in orders.items()
+        if question_id not in current
+    ]
+    to_reorder = {
+        current[question_id].id: order
+        for question_id, order in orders.items()
+        if question_id in current and current[question_id].order != order
+    }
+    
+    # At most one statement per kind of change
+    if to_delete:
+        db.execute(delete(models.TemplateDefinitionModel).where(models.TemplateDefinitionModel.id.in_(to_delete)))
+    if to_reorder:
+        db.execute(
+            update(models.TemplateDefinitionModel)
+            .where(models.TemplateDefinitionModel.id.in_(to_reorder))
+            .values(order=case(to_reorder, value=models.TemplateDefinitionModel.id))
+        )
+    if to_insert:
+        db.execute(insert(models.TemplateDefinitionModel).values(to_insert))
+    
+    if to_delete or to_reorder or to_insert:
+        db.commit()
+        invalidate_cache(f"template:{template_id}")
+    
+    # Return the resulting mapping in one query
+    return db.query(models.TemplateDefinitionModel).filter(
         models.TemplateDefinitionModel.template_id == template_id
-    ).delete()
+    ).order_by(models.TemplateDefinitionModel.order).all()
+
+def order_between(before, after):
+    """
+    Order key between two neighbouring keys (None: no neighbour on that side),
+    or None when they leave no gap
+    """
+    if before is None and after is None:
+        return ORDER_GAP
+    if before is None:
+        return after - ORDER_GAP
+    if after is None:
+        return before + ORDER_GAP
+    if after - before < 2:
+        return None
+    return (before + after) // 2
+
+def other_template_orders(db: Session, template_id: int, question_id: int):
+    return db.query(models.TemplateDefinitionModel.order).filter(
+        models.TemplateDefinitionModel.template_id == template_id,
+        models.TemplateDefinitionModel.question_id != question_id
+    ).order_by(models.TemplateDefinitionModel.order)
+
+def sparse_order_after(db: Session, template_id: int, question_id: int, after_question_id: Optional[int]):
+    """
+    Order key that places a question right after another one (None: first),
+    or None when the neighbouring keys leave no gap. Both neighbours are
+    index lookups, whatever the position in the template.
+    """
+    others = other_template_orders(db, template_id, question_id)
+    before = None
+    if after_question_id is not None:
+        before = db.query(models.TemplateDefinitionModel.order).filter(
+            models.TemplateDefinitionModel.template_id == template_id,
+            models.TemplateDefinitionModel.question_id == after_question_id
+        ).scalar()
+        if before is None:
+            raise HTTPException(status_code=404, detail=f"Question with ID {after_question_id} not in template")
+        others = others.filter(models.TemplateDefinitionModel.order > before)
+    return order_between(before, others.limit(1).scalar())
+
+def sparse_order_at(db: Session, template_id: int, question_id: int, position: int):
+    """
+    Order key that places a question at position among the template's other
+    questions, or None when the neighbouring keys leave no gap. Finding the
+    neighbours by OFFSET reads position index entries; sparse_order_after
+    avoids that when the caller knows the preceding question.
+    """
+    others = other_template_orders(db, template_id, question_id)
+    
+    if position == 0:
+        before, after = None, others.limit(1).scalar()
+    else:
+        neighbours = [order for (order,) in others.offset(position - 1).limit(2)]
+        if not neighbours:
+            # Past the end: append
+            neighbours = [db.query(func.max(models.TemplateDefinitionModel.order)).filter(
+                models.TemplateDefinitionModel.template_id == template_id,
+                models.TemplateDefinitionModel.question_id != question_id
+            ).scalar()]
+        before = neighbours[0]
+        after = neighbours[1] if len(neighbours) > 1 else None
+    return order_between(before, after)
+
+def rebalance_template_order(db: Session, template_id: int):
+    """
+    Respread a template's order keys ORDER_GAP apart, keeping their sequence, in one UPDATE
+    """
+    ids = [mapping_id for (mapping_id,) in db.query(models.TemplateDefinitionModel.id).filter(
+        models.TemplateDefinitionModel.template_id == template_id
+    ).order_by(models.TemplateDefinitionModel.order, models.TemplateDefinitionModel.id)]
+    if ids:
+        db.execute(
+            update(models.TemplateDefinitionModel)
+            .where(models.TemplateDefinitionModel.id.in_(ids))
+            .values(order=case(
+                {mapping_id: (index + 1) * ORDER_GAP for index, mapping_id in enumerate(ids)},
+                value=models.TemplateDefinitionModel.id
+            ))
+        )
+
+@app.put("/templates/{template_id}/questions/{question_id}/position", status_code=status.HTTP_200_OK, response_model=TemplateQuestionResponse)
+def move_template_question(template_id: int, question_id: int, move: TemplateQuestionMove, db: db_dependency):
+    """
+    Move a question to a position in the template, or insert it there if it
+    is not in the template yet. The position is either an index or the
+    question to follow. Only the moved row is written unless its new
+    neighbours have no gap left between them.
+    """
+    by_neighbour = "after_question_id" in move.model_fields_set
+    if by_neighbour:
+        if move.after_question_id == question_id:
+            raise HTTPException(status_code=400, detail="A question cannot follow itself")
+    elif move.position is None:
+        raise HTTPException(status_code=400, detail="position or after_question_id is required")
+    elif move.position < 0:
+        raise HTTPException(status_code=400, detail="position must not be negative")
     
-    # Add new questions
-    created_template_questions = []
-    for question_data in questions:
-        # Verify question exists
-        question = db.query(models.QuestionModel).filter(
-            models.QuestionModel.question_id == question_data.question_id
+    # Verify template exists
+    template = db.query(models.TemplateModel).filter(models.TemplateModel.template_id == template_id).first()
+    if template is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+    
+    mapping = db.query(models.TemplateDefinitionModel).filter(
+        models.TemplateDefinitionModel.template_id == template_id,
+        models.TemplateDefinitionModel.question_id == question_id
+    ).first()
+    if mapping is None:
+        # Verify question exists before inserting it
+        question = db.query(models.QuestionModel.question_id).filter(
+            models.QuestionModel.question_id == question_id
         ).first()
         if question is None:
-            raise HTTPException(status_code=404, detail=f"Question with ID {question_data.question_id} not found")
-        
-        # Create template question mapping
-        db_template_question = models.TemplateDefinitionModel(
-            template_id=template_id,
-            question_id=question_data.question_id,
-            order=question_data.order
-        )
-        
-        db.add(db_template_question)
-        created_template_questions.append(db_template_question)
+            raise HTTPException(status_code=404, detail=f"Question with ID {question_id} not found")
+        mapping = models.TemplateDefinitionModel(template_id=template_id, question_id=question_id)
+        db.add(mapping)
     
-    db.commit()
+    def locate():
+        if by_neighbour:
+            return sparse_order_after(db, template_id, question_id, move.after_question_id)
+        return sparse_order_at(db, template_id, question_id, move.position)
     
-    # Refresh all created objects
-    for tq in created_template_questions:
-        db.refresh(tq)
+    order = locate()
+    if order is None:
+        rebalance_template_order(db, template_id)
+        order = locate()
+    mapping.order = order
     
-    return created_template_questions
+    db.commit()
+    db.refresh(mapping)
+    invalidate_cache(f"template:{template_id}")
+    return mapping
 
 @app.get("/templates/{template_id}/questions", status_code=status.HTTP_200_OK, response_model=List[QuestionResponse])
-async def get_template_questions(template_id: int, db: db_dependency):
+def get_template_questions(template_id: int, db: db_dependency):
     # Verify template exists
     template = db.query(models.TemplateModel).filter(models.TemplateModel.template_id == template_id).first()
     if template is None:
         raise HTTPException(status_code=404, detail="Template not found")
     
     # Get questions associated with this template
-    template_questions = db.query(models.TemplateDefinitionModel).filter(
-        models.TemplateDefinitionModel.template_id == template_id
-    ).order_by(models.TemplateDefinitionModel.order).all()
-    
-    # Get question details
-    questions = []
-    for tq in template_questions:
-        question = db.query(models.QuestionModel).filter(
-            models.QuestionModel.question_id == tq.question_id
-        ).first()
-        if question:
-            questions.append(question)
+    questions = load_template_questions(db, template_id)
     
     return questions
 
 @app.delete("/templates/{template_id}/questions/{question_id}", status_code=status.HTTP_200_OK)
-async def remove_question_from_template(template_id: int, question_id: int, db: db_dependency):
+def remove_question_from_template(template_id: int, question_id: int, db: db_dependency):
     # Verify template exists
     template = db.query(models.TemplateModel).filter(models.TemplateModel.template_id == template_id).first()
     if template is None:
@@ -579,6 +1526,7 @@ async def remove_question_from_template(template_id: int, question_id: int, db:
     
     db.delete(template_question)
     db.commit()
+    invalidate_cache(f"template:{template_id}")
     return {"message": "Question removed from template successfully"}
 
 # Audit models
@@ -599,9 +1547,26 @@ class AuditResponse(AuditCreate):
     class Config:
         from_attributes = True
 
+class AuditPage(BaseModel):
+    items: List[AuditResponse]
+    next_cursor: Optional[str] = None
+
+def encode_audit_cursor(audit_log) -> str:
+    """
+    Encode the (created_at, audit_id) position of the last row on a page
+    """
+    return encode_cursor(audit_log.created_at.isoformat(), audit_log.audit_id)
+
+def decode_audit_cursor(cursor: str):
+    try:
+        created_at, audit_id = decode_cursor(cursor)
+        return datetime.fromisoformat(created_at), int(audit_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 # Audit endpoints
 @app.post("/audit", status_code=status.HTTP_201_CREATED, response_model=AuditResponse)
-async def create_audit_log(audit: AuditCreate, request: Request, db: db_dependency):
+def create_audit_log(audit: AuditCreate, request: Request, db: db_dependency):
     # Create audit log
     audit_data = audit.dict()
     
@@ -617,41 +1582,124 @@ async def create_audit_log(audit: AuditCreate, request: Request, db: db_dependen
     db.refresh(db_audit)
     return db_audit
 
-@app.get("/audit", status_code=status.HTTP_200_OK, response_model=List[AuditResponse])
-async def get_audit_logs(
+def filter_audit_query(query, user_id=None, entity_type=None, entity_id=None, action_type=None):
+    """
+    Apply the GET /audit filters; each combination is served by an index on audit_details
+    """
+    if user_id:
+        query = query.filter(models.AuditDetailsModel.user_id == user_id)
+    if entity_type:
+        query = query.filter(models.AuditDetailsModel.entity_type == entity_type)
+    if entity_id:
+        query = query.filter(models.AuditDetailsModel.entity_id == entity_id)
+    if action_type:
+        query = query.filter(models.AuditDetailsModel.action_type == action_type)
+    return query
+
+
+def audit_page_query(query, after=None):
+    """
+    Order newest first and, with after=(created_at, audit_id) of the last row
+    seen, seek past it instead of skipping rows, so every page costs the same
+    """
+    if after is not None:
+        created_at, audit_id = after
+        query = query.filter(or_(
+            models.AuditDetailsModel.created_at < created_at,
+            and_(
+                models.AuditDetailsModel.created_at == created_at,
+                models.AuditDetailsModel.audit_id < audit_id
+            )
+        ))
+    return query.order_by(
+        models.AuditDetailsModel.created_at.desc(),
+        models.AuditDetailsModel.audit_id.desc()
+    )
+
+@app.get("/audit", status_code=status.HTTP_200_OK, response_model=Union[List[AuditResponse], AuditPage])
+def get_audit_logs(
     db: db_dependency,
     skip: int = 0, 
     limit: int = 100, 
     user_id: Optional[int] = None,
     entity_type: Optional[str] = None,
     entity_id: Optional[int] = None,
-    action_type: Optional[str] = None
+    action_type: Optional[str] = None,
+    cursor: Optional[str] = None
 ):
     # Build query with filters
-    query = db.query(models.AuditDetailsModel)
+    query = filter_audit_query(
+        db.query(models.AuditDetailsModel),
+        user_id=user_id,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        action_type=action_type
+    )
     
-    if user_id:
-        query = query.filter(models.AuditDetailsModel.user_id == user_id)
-    if entity_type:
-        query = query.filter(models.AuditDetailsModel.entity_type == entity_type)
-    if entity_id:
-        query = query.filter(models.AuditDetailsModel.entity_id == entity_id)
-    if action_type:
-        query = query.filter(models.AuditDetailsModel.action_type == action_type)
+    # Cursor mode: keyset pages after the last row seen. An empty cursor is page 1.
+    if cursor is not None:
+        if limit < 1:
+            raise HTTPException(status_code=400, detail="limit must be at least 1")
+        after = decode_audit_cursor(cursor) if cursor else None
+        audit_logs = audit_page_query(query, after).limit(limit + 1).all()
+        
+        next_cursor = encode_audit_cursor(audit_logs[limit - 1]) if len(audit_logs) > limit else None
+        return {"items": audit_logs[:limit], "next_cursor": next_cursor}
     
     # Order by creation time (newest first) and apply pagination
     audit_logs = query.order_by(models.AuditDetailsModel.created_at.desc()).offset(skip).limit(limit).all()
     return audit_logs
 
+@app.get("/metrics", status_code=status.HTTP_200_OK, response_class=PlainTextResponse)
+def get_metrics():
+    if request_metrics is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    body = request_metrics.render()
+    if pool_metrics is not None:
+        body += pool_metrics.render()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/slow-queries", status_code=status.HTTP_200_OK)
+def get_slow_queries(limit: int = 100):
+    """
+    Statements slower than SLOW_QUERY_THRESHOLD_MS, one entry per fingerprint,
+    with the EXPLAIN plan captured the first time each was seen
+    """
+    if slow_query_log is None:
+        return {"enabled": False, "entries": []}
+    return {
+        "enabled": True,
+        "threshold_ms": slow_query_log.threshold * 1000,
+        "entries": slow_query_log.entries(limit)
+    }
+
+@app.delete("/debug/slow-queries", status_code=status.HTTP_200_OK)
+def clear_slow_queries():
+    if slow_query_log is not None:
+        slow_query_log.clear()
+    return {"message": "Slow query log cleared"}
+
+@app.get("/cache/stats", status_code=status.HTTP_200_OK)
+def get_cache_stats():
+    if response_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **response_cache.stats()}
+
+@app.get("/audit/pipeline", status_code=status.HTTP_200_OK)
+def get_audit_pipeline_metrics():
+    if audit_writer is None:
+        return {"mode": "sync"}
+    return audit_writer.metrics()
+
 @app.get("/audit/{audit_id}", status_code=status.HTTP_200_OK, response_model=AuditResponse)
-async def get_audit_log(audit_id: int, db: db_dependency):
+def get_audit_log(audit_id: int, db: db_dependency):
     audit_log = db.query(models.AuditDetailsModel).filter(models.AuditDetailsModel.audit_id == audit_id).first()
     if audit_log is None:
         raise HTTPException(status_code=404, detail="Audit log not found")
     return audit_log
 
 @app.put("/users/{user_id}", status_code=status.HTTP_200_OK)
-async def update_user(user_id: int, user: UserUpdateModel, request: Request, db: db_dependency):
+def update_user(user_id: int, user: UserUpdateModel, request: Request, db: db_dependency):
     db_user = db.query(models.UserModel).filter(models.UserModel.user_id == user_id).first()
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
@@ -667,12 +1715,9 @@ async def update_user(user_id: int, user: UserUpdateModel, request: Request, db:
     for key, value in user_data.items():
         setattr(db_user, key, value)
     
-    db.commit()
-    db.refresh(db_user)
-    
-    # Create audit entry
+    # Create audit entry in the same transaction
     admin_id = 1  # Placeholder, should come from authentication
-    await create_audit_entry(
+    create_audit_entry(
         db=db,
         user_id=admin_id,
         action_type="UPDATE",
@@ -683,17 +1728,38 @@ async def update_user(user_id: int, user: UserUpdateModel, request: Request, db:
         ip_address=request.client.host,
         user_agent=request.headers.get("user-agent", "")
     )
+    db.commit()
+    db.refresh(db_user)
+    invalidate_cache(f"user:{user_id}")
     
     return db_user
 
 # Helper function to create audit log
-async def create_audit_entry(db: Session, user_id: int, action_type: str, entity_type: str, 
+def create_audit_entry(db: Session, user_id: int, action_type: str, entity_type: str, 
                            entity_id: int, old_values=None, new_values=None, 
                            ip_address=None, user_agent=None):
     """
-    Helper function to create audit entries from other endpoints
+    Helper function to create audit entries from other endpoints.
+    The entry is only added to the session; the caller commits it together
+    with the entity change so both land in one transaction. In buffered
+    audit mode the entry is handed to the write-behind audit pipeline when
+    the caller's transaction commits instead.
     """
-    audit_data = {
+    audit_data = audit_row(user_id, action_type, entity_type, entity_id,
+                           old_values, new_values, ip_address, user_agent)
+    
+    if audit_writer is not None:
+        # Buffered mode: queued once this transaction commits, written in a later batch
+        audit_writer.enqueue_on_commit(db, audit_data)
+        return None
+    
+    db_audit = models.AuditDetailsModel(**audit_data)
+    db.add(db_audit)
+    return db_audit
+
+def audit_row(user_id: int, action_type: str, entity_type: str, entity_id: int,
+              old_values=None, new_values=None, ip_address=None, user_agent=None):
+    return {
         "user_id": user_id,
         "action_type": action_type,
         "entity_type": entity_type,
@@ -703,18 +1769,26 @@ async def create_audit_entry(db: Session, user_id: int, action_type: str, entity
         "ip_address": ip_address,
         "user_agent": user_agent
     }
-    
-    db_audit = models.AuditDetailsModel(**audit_data)
-    db.add(db_audit)
-    db.commit()
-    return db_audit
+
+def create_audit_entries(db: Session, rows):
+    """
+    Batched create_audit_entry for rows built with audit_row: one multi-row
+    INSERT in the caller's transaction, or the buffered audit pipeline
+    """
+    if not rows:
+        return
+    if audit_writer is not None:
+        for row in rows:
+            audit_writer.enqueue_on_commit(db, row)
+        return
+    db.execute(insert(models.AuditDetailsModel).values(rows))
 
 class UserRoleCreate(BaseModel):
     user_id: int
     access_type: str  # "administrator", "editor", "user"
 
 class UserRoleResponse(BaseModel):
-    id: int
+    id: Optional[int] = None  # None for the computed default role
     user_id: int
     access_type: str
     template_id: Optional[int] = None
@@ -722,9 +1796,89 @@ class UserRoleResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class UserRoleBulkResult(BaseModel):
+    user_id: int
+    access_type: str
+    outcome: str  # "created", "updated", "unchanged" or "user_not_found"
+
+# Assign global roles to many users at once
+@app.post("/user-roles/bulk", status_code=status.HTTP_200_OK, response_model=List[UserRoleBulkResult])
+def assign_user_roles_bulk(assignments: List[UserRoleCreate], request: Request, db: db_dependency):
+    """
+    Assign global roles in one transaction: one query reads the users and
+    their current roles, then at most one INSERT, one UPDATE and one audit
+    INSERT are run. Unknown users are reported and skipped.
+    """
+    user_ids = [assignment.user_id for assignment in assignments]
+    if len(set(user_ids)) != len(user_ids):
+        raise HTTPException(status_code=400, detail="Each user can only be assigned one role per request")
+    if not assignments:
+        return []
+    
+    # Existing users with their current global role
+    current = {}
+    for user_id, access_type in db.query(models.UserModel.user_id, models.TemplateAccessModel.access_type).outerjoin(
+        models.TemplateAccessModel,
+        and_(
+            models.TemplateAccessModel.user_id == models.UserModel.user_id,
+            models.TemplateAccessModel.template_id == None  # Using NULL for global roles
+        )
+    ).filter(models.UserModel.user_id.in_(user_ids)):
+        current.setdefault(user_id, access_type)
+    
+    results = []
+    created = []
+    updated = {}
+    audit_rows = []
+    admin_id = 1  # Placeholder, should come from authentication
+    for assignment in assignments:
+        if assignment.user_id not in current:
+            outcome = "user_not_found"
+        elif current[assignment.user_id] is None:
+            outcome = "created"
+            created.append({"user_id": assignment.user_id, "access_type": assignment.access_type, "template_id": None})
+        elif current[assignment.user_id] != assignment.access_type:
+            outcome = "updated"
+            updated[assignment.user_id] = assignment.access_type
+        else:
+            outcome = "unchanged"
+        
+        if outcome in ("created", "updated"):
+            audit_rows.append(audit_row(
+                user_id=admin_id,
+                action_type="CREATE" if outcome == "created" else "UPDATE",
+                entity_type="USER_ROLE",
+                entity_id=assignment.user_id,
+                old_values={"access_type": current[assignment.user_id]} if outcome == "updated" else None,
+                new_values={"access_type": assignment.access_type},
+                ip_address=request.client.host,
+                user_agent=request.headers.get("user-agent", "")
+            ))
+        results.append({"user_id": assignment.user_id, "access_type": assignment.access_type, "outcome": outcome})
+    
+    # The unique constraint does not cover NULL template_ids, so global roles
+    # are split into inserts and updates here rather than upserted
+    if created:
+        db.execute(insert(models.TemplateAccessModel).values(created))
+    if updated:
+        db.execute(
+            update(models.TemplateAccessModel)
+            .where(
+                models.TemplateAccessModel.template_id == None,  # Using NULL for global roles
+                models.TemplateAccessModel.user_id.in_(list(updated))
+            )
+            .values(access_type=case(updated, value=models.TemplateAccessModel.user_id))
+        )
+    if created or updated:
+        # Audit entries in the same transaction
+        create_audit_entries(db, audit_rows)
+        db.commit()
+    
+    return results
+
 # Assign a global role to a user
 @app.post("/user-roles", status_code=status.HTTP_201_CREATED, response_model=UserRoleResponse)
-async def assign_user_role(user_role: UserRoleCreate, request: Request, db: db_dependency):
+def assign_user_role(user_role: UserRoleCreate, request: Request, db: db_dependency):
     # Check if user already has a global role
     existing_role = db.query(models.TemplateAccessModel).filter(
         models.TemplateAccessModel.user_id == user_role.user_id,
@@ -751,29 +1905,30 @@ async def assign_user_role(user_role: UserRoleCreate, request: Request, db: db_d
 
 # Get a user's role
 @app.get("/user-roles/{user_id}", status_code=status.HTTP_200_OK, response_model=UserRoleResponse)
-async def get_user_role(user_id: int, db: db_dependency):
-    # Check for global role
-    user_role = db.query(models.TemplateAccessModel).filter(
-        models.TemplateAccessModel.user_id == user_id,
-        models.TemplateAccessModel.template_id == None  # Using NULL for global roles
-    ).first()
-    
-    if not user_role:
-        # If no global role, create default "user" role
-        user_role = models.TemplateAccessModel(
-            user_id=user_id,
-            access_type="user",
-            template_id=None  # Using NULL for global roles
+def get_user_role(user_id: int, db: db_dependency):
+    """
+    Read-only: a user without a stored global role gets the computed default
+    "user" role. Run backfill_roles.py to store the defaults.
+    """
+    # Verify user exists and get the global role in the same query
+    row = db.query(models.UserModel.user_id, models.TemplateAccessModel).outerjoin(
+        models.TemplateAccessModel,
+        and_(
+            models.TemplateAccessModel.user_id == models.UserModel.user_id,
+            models.TemplateAccessModel.template_id == None  # Using NULL for global roles
         )
-        db.add(user_role)
-        db.commit()
-        db.refresh(user_role)
+    ).filter(models.UserModel.user_id == user_id).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="User not found")
     
+    user_role = row[1]
+    if user_role is None:
+        return {"id": None, "user_id": user_id, "access_type": models.DEFAULT_ACCESS_TYPE, "template_id": None}
     return user_role
 
 # Get all users with their roles
 @app.get("/user-roles", status_code=status.HTTP_200_OK, response_model=List[UserRoleResponse])
-async def get_all_user_roles(db: db_dependency):
+def get_all_user_roles(db: db_dependency):
     user_roles = db.query(models.TemplateAccessModel).filter(
         models.TemplateAccessModel.template_id == None  # Using NULL for global roles
     ).all()
@@ -0,0 +1,281 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+CONNECTION_AGE_BUCKETS = (1, 10, 60, 300, 900, 1800, 3600, 7200, 14400)
+
+# Stats of the request being handled; the endpoint threadpool copies the
+# context, so statements run from worker threads find the same object
+_current_request = ContextVar("current_request", default=None)
+
+
+class RequestStats:
+    """
+    Wall time, database time, statement count, rows and connection pool wait
+    of one request
+    """
+
+    __slots__ = ("started", "wall_seconds", "db_seconds", "statements", "rows", "pool_wait_seconds")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.wall_seconds = 0.0
+        self.db_seconds = 0.0
+        self.statements = 0
+        self.rows = 0
+        self.pool_wait_seconds = 0.0
+
+    def server_timing(self):
+        return (f"app;dur={self.wall_seconds * 1000:.1f}, "
+                f"db;dur={self.db_seconds * 1000:.1f};desc=\"{self.statements} statements, {self.rows} rows\", "
+                f"pool;dur={self.pool_wait_seconds * 1000:.1f};desc=\"connection checkout\"")
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_latency = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.rows = 0
+        self.responses = {}  # status code -> count
+
+
+class RequestMetrics:
+    """
+    Per-route request metrics fed by the HTTP middleware and by engine events.
+
+    Statements are attributed to the request whose context they run in.
+    Rows are the DB-API rowcount of each statement: rows returned by SELECTs on
+    drivers with buffered cursors (PyMySQL) and rows written by DML.
+    """
+
+    def __init__(self):
+        # Requests finish on the event loop, statements run in worker threads
+        self._lock = threading.Lock()
+        self._routes = {}  # (method, route template) -> RouteMetrics
+
+    def instrument(self, engine):
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        # Only the InstrumentedQueuePool (pool.py) reports checkout waits
+        if hasattr(engine.pool, "wait_observers"):
+            engine.pool.wait_observers.append(self._observe_pool_wait)
+
+    def start_request(self):
+        """
+        Begin collecting for the current request; pass the token to finish_request
+        """
+        return _current_request.set(RequestStats())
+
+    def finish_request(self, token, method, route, status_code):
+        stats = _current_request.get()
+        _current_request.reset(token)
+        stats.wall_seconds = time.perf_counter() - stats.started
+
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = RouteMetrics()
+            metrics.latency.observe(stats.wall_seconds)
+            metrics.db_latency.observe(stats.db_seconds)
+            metrics.statements.observe(stats.statements)
+            metrics.rows += stats.rows
+            metrics.responses[status_code] = metrics.responses.get(status_code, 0) + 1
+        return stats
+
+    def render(self):
+        """
+        Metrics in the Prometheus text exposition format
+        """
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = []
+            self._render_histograms(lines, routes, "http_request_duration_seconds",
+                                    "Request wall time", lambda metrics: metrics.latency)
+            self._render_histograms(lines, routes, "http_request_db_duration_seconds",
+                                    "Time spent executing SQL statements per request", lambda metrics: metrics.db_latency)
+            self._render_histograms(lines, routes, "http_request_db_statements",
+                                    "SQL statements executed per request", lambda metrics: metrics.statements)
+
+            lines.append("# HELP http_request_db_rows_total Rows returned or written by SQL statements")
+            lines.append("# TYPE http_request_db_rows_total counter")
+            for (method, route), metrics in routes:
+                lines.append(f"http_request_db_rows_total{{{_labels(method, route)}}} {metrics.rows}")
+
+            lines.append("# HELP http_requests_total Requests by response status")
+            lines.append("# TYPE http_requests_total counter")
+            for (method, route), metrics in routes:
+                for status_code, count in sorted(metrics.responses.items()):
+                    lines.append(f"http_requests_total{{{_labels(method, route)},status=\"{status_code}\"}} {count}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(lines, routes, name, help_text, histogram_of):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (method, route), metrics in routes:
+            _render_histogram(lines, name, _labels(method, route), histogram_of(metrics))
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_request.get() is not None and context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @staticmethod
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_request.get()
+        started = getattr(context, "_metrics_started", None)
+        if stats is None or started is None:
+            return
+        stats.db_seconds += time.perf_counter() - started
+        stats.statements += 1
+        if cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+
+    @staticmethod
+    def _observe_pool_wait(seconds, timed_out):
+        stats = _current_request.get()
+        if stats is not None:
+            stats.pool_wait_seconds += seconds
+
+
+class PoolMetrics:
+    """
+    Connection pool gauges, checkout wait times and connection ages.
+
+    Checkout waits come from InstrumentedQueuePool (pool.py); a connection's
+    age is observed when it is closed, e.g. on recycle or invalidation.
+    """
+
+    def __init__(self):
+        # Pool events fire in worker threads
+        self._lock = threading.Lock()
+        self.engine = None
+        self.checkout_wait = Histogram(POOL_WAIT_BUCKETS)
+        self.connection_age = Histogram(CONNECTION_AGE_BUCKETS)
+        self.timeouts = 0
+        self.connects = 0
+        self._connected_at = {}  # id(DBAPI connection) -> time.monotonic() of connect
+
+    def instrument(self, engine):
+        self.engine = engine
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "close", self._on_close)
+        event.listen(engine, "close_detached", self._on_close_detached)
+        if hasattr(engine.pool, "wait_observers"):
+            engine.pool.wait_observers.append(self._observe_wait)
+
+    def render(self):
+        """
+        Metrics in the Prometheus text exposition format
+        """
+        pool = self.engine.pool
+        now = time.monotonic()
+        lines = []
+        # StaticPool (in-memory SQLite) has no size or checkout accounting
+        if hasattr(pool, "checkedout"):
+            for name, help_text, value in (
+                ("db_pool_size", "Connections the pool keeps open between checkouts", pool.size()),
+                ("db_pool_checked_out", "Connections currently checked out", pool.checkedout()),
+                ("db_pool_idle", "Open connections waiting in the pool", pool.checkedin()),
+                ("db_pool_overflow", "Open connections beyond the pool size (negative: unused pool slots)", pool.overflow()),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+
+        with self._lock:
+            oldest = max((now - connected for connected in self._connected_at.values()), default=0.0)
+            lines.append("# HELP db_pool_oldest_connection_age_seconds Age of the oldest open connection")
+            lines.append("# TYPE db_pool_oldest_connection_age_seconds gauge")
+            lines.append(f"db_pool_oldest_connection_age_seconds {oldest:.3f}")
+
+            lines.append("# HELP db_pool_checkout_wait_seconds Time to get a connection from the pool, including connects")
+            lines.append("# TYPE db_pool_checkout_wait_seconds histogram")
+            _render_histogram(lines, "db_pool_checkout_wait_seconds", "", self.checkout_wait)
+
+            lines.append("# HELP db_pool_connection_age_seconds Age of connections when they were closed")
+            lines.append("# TYPE db_pool_connection_age_seconds histogram")
+            _render_histogram(lines, "db_pool_connection_age_seconds", "", self.connection_age)
+
+            lines.append("# HELP db_pool_checkout_timeouts_total Checkouts that gave up after DB_POOL_TIMEOUT")
+            lines.append("# TYPE db_pool_checkout_timeouts_total counter")
+            lines.append(f"db_pool_checkout_timeouts_total {self.timeouts}")
+
+            lines.append("# HELP db_pool_connects_total Connections opened")
+            lines.append("# TYPE db_pool_connects_total counter")
+            lines.append(f"db_pool_connects_total {self.connects}")
+
+        resizes = getattr(pool, "resizes", None)
+        if resizes is not None:
+            lines.append("# HELP db_pool_resizes_total Adaptive pool size changes")
+            lines.append("# TYPE db_pool_resizes_total counter")
+            for direction, count in sorted(resizes.items()):
+                lines.append(f"db_pool_resizes_total{{direction=\"{direction}\"}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def _observe_wait(self, seconds, timed_out):
+        with self._lock:
+            self.checkout_wait.observe(seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+            self._connected_at[id(dbapi_connection)] = time.monotonic()
+
+    def _on_close(self, dbapi_connection, connection_record):
+        self._on_close_detached(dbapi_connection)
+
+    def _on_close_detached(self, dbapi_connection):
+        with self._lock:
+            connected = self._connected_at.pop(id(dbapi_connection), None)
+            if connected is not None:
+                self.connection_age.observe(time.monotonic() - connected)
+
+
+def _render_histogram(lines, name, labels, histogram):
+    prefix = f"{labels}," if labels else ""
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{{{prefix}le=\"{bound:g}\"}} {cumulative}")
+    lines.append(f"{name}_bucket{{{prefix}le=\"+Inf\"}} {histogram.count}")
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {histogram.sum:.6f}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+
+
+def _labels(method, route):
+    route = route.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+    return f"method=\"{method}\",route=\"{route}\""
+
+
+request_metrics = RequestMetrics() if METRICS_ENABLED else None
+pool_metrics = PoolMetrics() if METRICS_ENABLED else None
@@ -1,11 +1,20 @@
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ForeignKey, DateTime, Enum, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ForeignKey, DateTime, Enum, UniqueConstraint, Index
 from sqlalchemy.sql import func
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 from database import Base
 
+# DateTime that SQLite stores the way CURRENT_TIMESTAMP writes server defaults,
+# without the ".000000" SQLAlchemy would append to bound values. SQLite compares
+# the stored text, so keyset cursors only work when both sides match.
+Timestamp = DateTime().with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite"
+)
+
 # SQLAlchemy Models
 class UserModel(Base):
     __tablename__ = "userbase"
@@ -25,6 +34,14 @@ class QuestionModel(Base):
     section = Column(String(50), nullable=False)
     answer_type = Column(String(50), nullable=False)
     created_by = Column(Integer, ForeignKey("userbase.user_id"), nullable=False)
+    
+    # Indexes for the GET /questions filters, each ordered by question_id for paging
+    __table_args__ = (
+        Index('ix_question_phase', 'phase', 'question_id'),
+        Index('ix_question_section', 'section', 'question_id'),
+        Index('ix_question_answer_type', 'answer_type', 'question_id'),
+        Index('ix_question_created_by', 'created_by', 'question_id'),
+    )
 
 # New models for Templates
 class TemplateModel(Base):
@@ -35,12 +52,20 @@ class TemplateModel(Base):
     purpose = Column(Text, nullable=True)
     type = Column(String(50), nullable=False)
     created_by = Column(Integer, ForeignKey("userbase.user_id"), nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, server_default=func.now(), onupdate=func.now())
     
     # Relationships
     questions = relationship("TemplateDefinitionModel", back_populates="template")
     
+    # Indexes for the filtered, template_id-ordered template list
+    __table_args__ = (
+        Index('ix_template_type', 'type', 'template_id'),
+    )
+    
+# Global role of users without a stored one (see backfill_roles.py)
+DEFAULT_ACCESS_TYPE = "user"
+
 class TemplateAccessModel(Base):
     __tablename__ = "sfr_users"
     
@@ -53,6 +78,8 @@ class TemplateAccessModel(Base):
     __table_args__ = (
         # For NULL or 0 template_id values, still ensure user_id is unique for global roles
         UniqueConstraint('template_id', 'user_id', name='uix_template_user'),
+        # A user's grants in template order, and the global role lookup
+        Index('ix_sfr_users_user_template', 'user_id', 'template_id'),
     )
     
 class TemplateDefinitionModel(Base):
@@ -69,6 +96,8 @@ class TemplateDefinitionModel(Base):
     # Constraints
     __table_args__ = (
         UniqueConstraint('template_id', 'question_id', name='uix_template_question'),
+        # Reads a template's questions in order and finds a move's neighbours
+        Index('ix_template_definition_order', 'template_id', 'order'),
     )
 
 class AuditDetailsModel(Base):
@@ -83,8 +112,19 @@ class AuditDetailsModel(Base):
     new_values = Column(Text, nullable=True)  # JSON string of new values
     ip_address = Column(String(45), nullable=True)  # IPv6 compatible
     user_agent = Column(String(255), nullable=True)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
     
     # Relationship with UserModel
     user = relationship("UserModel")
+    
+    # Indexes matching the GET /audit filters, each ending in the
+    # (created_at, audit_id) sort order so pages are read in index order
+    __table_args__ = (
+        Index('ix_audit_created', 'created_at', 'audit_id'),
+        Index('ix_audit_entity_created', 'entity_type', 'entity_id', 'created_at', 'audit_id'),
+        Index('ix_audit_entity_type_created', 'entity_type', 'created_at', 'audit_id'),
+        Index('ix_audit_entity_id_created', 'entity_id', 'created_at', 'audit_id'),
+        Index('ix_audit_user_created', 'user_id', 'created_at', 'audit_id'),
+        Index('ix_audit_action_created', 'action_type', 'created_at', 'audit_id'),
+    )
 
@@ -0,0 +1,209 @@
+"""
+Connection pool instrumentation and adaptive sizing.
+
+InstrumentedQueuePool times every checkout, including waits for a free
+connection, so the metrics can show requests queueing on the pool. It can
+also be resized while connections are in use. With POOL_ADAPTIVE=true,
+PoolAutoscaler uses those timings to grow the pool when checkouts wait longer
+than POOL_WAIT_TARGET_MS, and shrinks it one connection at a time once
+connections sit idle, within POOL_MIN_SIZE..POOL_MAX_SIZE. POOL_MAX_SIZE caps
+every open connection, overflow included: as the pool grows, its overflow
+allowance shrinks by the same amount.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+POOL_ADAPTIVE = os.getenv("POOL_ADAPTIVE", "false").lower() == "true"
+POOL_MIN_SIZE = int(os.getenv("POOL_MIN_SIZE", "0"))  # 0: the configured DB_POOL_SIZE
+POOL_MAX_SIZE = int(os.getenv("POOL_MAX_SIZE", "0"))  # 0: DB_POOL_SIZE + DB_MAX_OVERFLOW
+POOL_WAIT_TARGET_MS = float(os.getenv("POOL_WAIT_TARGET_MS", "5"))
+POOL_ADAPT_INTERVAL = float(os.getenv("POOL_ADAPT_INTERVAL", "5"))
+POOL_SHRINK_AFTER = int(os.getenv("POOL_SHRINK_AFTER", "12"))  # idle intervals before shrinking
+
+# Grow when more than this share of checkouts in an interval waited too long
+SLOW_CHECKOUT_FRACTION = 0.05
+
+logger = logging.getLogger("pool")
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that reports how long each checkout took and can be resized.
+
+    QueuePool has no public resize, and recreate() would drop every warm
+    connection. resize() therefore moves the queue bound and the overflow
+    counter together, which keeps the pool's own accounting (open connections
+    = overflow + pool size) intact.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Called with (seconds, timed out) after every checkout from the pool
+        self.wait_observers = []
+        self.resizes = {"grow": 0, "shrink": 0}
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            for observer in self.wait_observers:
+                observer(waited, timed_out)
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; keep observers and counters
+        pool = super().recreate()
+        pool.wait_observers = self.wait_observers
+        pool.resizes = self.resizes
+        return pool
+
+    def resize(self, pool_size, max_overflow=None):
+        """
+        Keep up to pool_size connections open between checkouts, and open at
+        most max_overflow (default: unchanged) more under load. Idle
+        connections beyond the new size are closed right away; checked out
+        ones are closed when they are returned.
+        """
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        surplus = []
+        with self._overflow_lock, self._pool.mutex:
+            if max_overflow is not None:
+                self._max_overflow = max_overflow
+            delta = pool_size - self._pool.maxsize
+            if delta == 0:
+                return
+            self._pool.maxsize = pool_size
+            self._overflow -= delta
+            # The queue only refuses returns when exactly full, so it must not
+            # be left holding more than its new bound
+            while self._pool._qsize() > pool_size:
+                surplus.append(self._pool._get())
+        for record in surplus:
+            record.close()
+            self._dec_overflow()
+        self.resizes["grow" if delta > 0 else "shrink"] += 1
+
+
+class PoolAutoscaler:
+    """
+    Resizes an InstrumentedQueuePool from the checkout waits measured in each
+    POOL_ADAPT_INTERVAL: a quarter larger after an interval with slow
+    checkouts or timeouts, one smaller after POOL_SHRINK_AFTER intervals in
+    which fewer connections than the pool size were ever checked out.
+    max_size bounds the pool size plus its overflow.
+    """
+
+    def __init__(self, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE, wait_target_ms=POOL_WAIT_TARGET_MS,
+                 interval=POOL_ADAPT_INTERVAL, shrink_after=POOL_SHRINK_AFTER):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.wait_target = wait_target_ms / 1000.0
+        self.interval = interval
+        self.shrink_after = shrink_after
+        self.max_overflow = None
+        self.engine = None
+
+        # Checkouts happen in worker threads, decisions on the event loop
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._slow = 0
+        self._timeouts = 0
+        self._peak_checked_out = 0
+        self._idle_intervals = 0
+        self._task = None
+
+    def instrument(self, engine):
+        pool = engine.pool
+        if not isinstance(pool, InstrumentedQueuePool) or pool._max_overflow < 0:
+            logger.warning("Adaptive pool sizing needs a bounded InstrumentedQueuePool; leaving the pool as configured")
+            return
+        self.engine = engine
+        self.min_size = self.min_size or pool.size()
+        self.max_overflow = pool._max_overflow
+        self.max_size = max(self.max_size or pool.size() + self.max_overflow, self.min_size)
+        pool.resize(pool.size(), self.overflow_for(pool.size()))
+        pool.wait_observers.append(self._observe_wait)
+
+    def overflow_for(self, pool_size):
+        """
+        Overflow allowed on top of pool_size: the configured DB_MAX_OVERFLOW,
+        cut down so that the pool never opens more than max_size connections
+        """
+        return max(0, min(self.max_overflow, self.max_size - pool_size))
+
+    async def start(self):
+        if self.engine is not None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                # Shrinking closes connections, which is blocking I/O
+                await asyncio.to_thread(self.adjust)
+            except Exception:
+                logger.exception("Adaptive pool sizing failed")
+
+    def _observe_wait(self, seconds, timed_out):
+        checked_out = self.engine.pool.checkedout()
+        with self._lock:
+            self._checkouts += 1
+            if seconds > self.wait_target:
+                self._slow += 1
+            if timed_out:
+                self._timeouts += 1
+            self._peak_checked_out = max(self._peak_checked_out, checked_out)
+
+    def adjust(self):
+        """
+        Decide on the interval that just ended; returns the new size, if any
+        """
+        with self._lock:
+            checkouts, slow, timeouts, peak = self._checkouts, self._slow, self._timeouts, self._peak_checked_out
+            self._checkouts = self._slow = self._timeouts = self._peak_checked_out = 0
+
+        pool = self.engine.pool
+        size = pool.size()
+        if timeouts or (checkouts and slow / checkouts > SLOW_CHECKOUT_FRACTION):
+            self._idle_intervals = 0
+            target = max(size, min(self.max_size, size + max(1, size // 4)))
+        elif not slow and peak < size:
+            self._idle_intervals += 1
+            if self._idle_intervals < self.shrink_after:
+                return None
+            self._idle_intervals = 0
+            target = min(size, max(self.min_size, size - 1))
+        else:
+            self._idle_intervals = 0
+            return None
+
+        if target == size:
+            return None
+        pool.resize(target, self.overflow_for(target))
+        logger.info("Connection pool resized from %d to %d (%d/%d slow checkouts, %d timeouts, peak %d checked out)",
+                    size, target, slow, checkouts, timeouts, peak)
+        return target
+
+
+pool_autoscaler = PoolAutoscaler() if POOL_ADAPTIVE else None
@@ -0,0 +1,392 @@
+"""
+In-process full-text search over question_master.
+
+Questions are tokenized (lowercased, optionally stemmed) into an inverted
+index over the question, context, phase and section fields and ranked with
+BM25. The index is kept current by the question create/update/delete
+endpoints. On startup it is loaded from a snapshot when that snapshot still
+matches the table's content, otherwise rebuilt from the database.
+
+Build a snapshot for the next cold start with:
+
+    python search.py rebuild
+"""
+import bisect
+import hashlib
+import heapq
+import math
+import os
+import pickle
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from operator import itemgetter
+
+import models
+from database import SessionLocal
+
+SEARCH_INDEX_ENABLED = os.getenv("SEARCH_INDEX_ENABLED", "true").lower() == "true"
+SEARCH_STEMMING = os.getenv("SEARCH_STEMMING", "true").lower() == "true"
+SEARCH_SNAPSHOT_PATH = os.getenv("SEARCH_SNAPSHOT_PATH", "search_index.pickle")
+
+# Term frequency weight per indexed field
+FIELD_WEIGHTS = {"question": 2.0, "context": 1.0, "phase": 1.0, "section": 1.0}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Most words a typeahead prefix expands to
+MAX_PREFIX_EXPANSIONS = 50
+
+SNAPSHOT_VERSION = 2
+
+# Checksums are sums of per-question hashes, so they can be kept up to date
+# on every change and do not depend on row order
+CHECKSUM_MODULUS = 2 ** 64
+
+_TOKEN_RE = re.compile(r"\w+")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by do does for from how in is it of on or that the "
+    "this to was what when where which who why will with you your".split()
+)
+
+_SUFFIXES = ("ational", "ization", "fulness", "iveness", "ations", "ation", "ments",
+             "ment", "ness", "ings", "ing", "edly", "ies", "ed", "es", "ly", "s")
+
+
+@lru_cache(maxsize=200000)
+def stem(word: str) -> str:
+    """
+    Light suffix-stripping stemmer; only strips when a stem of 3+ letters remains
+    """
+    if not SEARCH_STEMMING or len(word) <= 3 or word.isdigit():
+        return word
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            if suffix == "ies":
+                return word[:-3] + "y"
+            return word[:-len(suffix)]
+    return word
+
+
+def content_hash(question) -> int:
+    """
+    Hash of a question's id and indexed fields
+    """
+    text = "\x1f".join(str(getattr(question, field) or "") for field in ("question_id", *FIELD_WEIGHTS))
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "big")
+
+
+def tokenize(text: str):
+    """
+    Lowercased word tokens, with stopwords removed unless nothing else is left
+    """
+    words = _TOKEN_RE.findall((text or "").lower())
+    content_words = [word for word in words if word not in _STOPWORDS]
+    return content_words or words
+
+
+class QuestionSearchIndex:
+    """
+    Inverted index with BM25 ranking and prefix matching on the last query word
+    """
+
+    def __init__(self):
+        # Endpoints update and query the index from worker threads
+        self._lock = threading.RLock()
+        self._reset()
+        self.ready = False
+        self._building = False
+        self._backlog = []
+
+    def _reset(self):
+        self._postings = {}      # stem -> {question_id: weighted term frequency}
+        self._surface = {}       # word as written -> number of documents containing it
+        self._words = []         # sorted surface words, for prefix lookups
+        self._documents = {}     # question_id -> (stem frequencies, surface words, length, content hash)
+        self._total_length = 0.0
+        self._checksum = 0       # sum of the content hashes of all indexed questions
+
+    # Indexing
+
+    def add(self, question):
+        """
+        Index a question, replacing any previous version of it
+        """
+        document = self._analyze(question)
+        with self._lock:
+            if self._building:
+                self._backlog.append(("add", question.question_id, document))
+            self._remove(question.question_id)
+            self._add(question.question_id, document)
+
+    def remove(self, question_id: int):
+        with self._lock:
+            if self._building:
+                self._backlog.append(("remove", question_id, None))
+            self._remove(question_id)
+
+    def _analyze(self, question):
+        frequencies = Counter()
+        surface = set()
+        for field, weight in FIELD_WEIGHTS.items():
+            for word in tokenize(getattr(question, field)):
+                frequencies[stem(word)] += weight
+                surface.add(word)
+        return frequencies, frozenset(surface), sum(frequencies.values()), content_hash(question)
+
+    def _add(self, question_id, document, keep_words_sorted=True):
+        frequencies, surface, length, row_hash = document
+        self._documents[question_id] = document
+        self._total_length += length
+        self._checksum = (self._checksum + row_hash) % CHECKSUM_MODULUS
+        for term, frequency in frequencies.items():
+            self._postings.setdefault(term, {})[question_id] = frequency
+        for word in surface:
+            count = self._surface.get(word, 0)
+            if count == 0 and keep_words_sorted:
+                bisect.insort(self._words, word)
+            self._surface[word] = count + 1
+
+    def _remove(self, question_id):
+        document = self._documents.pop(question_id, None)
+        if document is None:
+            return
+        frequencies, surface, length, row_hash = document
+        self._total_length -= length
+        self._checksum = (self._checksum - row_hash) % CHECKSUM_MODULUS
+        for term in frequencies:
+            postings = self._postings[term]
+            del postings[question_id]
+            if not postings:
+                del self._postings[term]
+        for word in surface:
+            count = self._surface[word] - 1
+            if count:
+                self._surface[word] = count
+            else:
+                del self._surface[word]
+                del self._words[bisect.bisect_left(self._words, word)]
+
+    # Building
+
+    def rebuild(self):
+        """
+        Rebuild from question_master. Updates made while the build runs are
+        replayed on top of it before it is swapped in.
+        """
+        with self._lock:
+            self._building = True
+            self._backlog = []
+
+        started = time.perf_counter()
+        fresh = QuestionSearchIndex()
+        db = SessionLocal()
+        try:
+            rows = db.query(
+                models.QuestionModel.question_id,
+                models.QuestionModel.question,
+                models.QuestionModel.context,
+                models.QuestionModel.phase,
+                models.QuestionModel.section
+            ).yield_per(10000)
+            # Bulk load, then sort the vocabulary once
+            for row in rows:
+                fresh._add(row.question_id, fresh._analyze(row), keep_words_sorted=False)
+            fresh._words = sorted(fresh._surface)
+        except Exception:
+            with self._lock:
+                self._building = False
+                self._backlog = []
+            raise
+        finally:
+            db.close()
+
+        with self._lock:
+            for action, question_id, document in self._backlog:
+                fresh._remove(question_id)
+                if action == "add":
+                    fresh._add(question_id, document)
+            self._swap(fresh)
+            self._building = False
+            self._backlog = []
+            self.ready = True
+        return {"documents": len(self._documents), "seconds": time.perf_counter() - started}
+
+    def _swap(self, other):
+        self._postings = other._postings
+        self._surface = other._surface
+        self._words = other._words
+        self._documents = other._documents
+        self._total_length = other._total_length
+        self._checksum = other._checksum
+
+    def save(self, path=SEARCH_SNAPSHOT_PATH):
+        with self._lock:
+            snapshot = {
+                "version": SNAPSHOT_VERSION,
+                "stemming": SEARCH_STEMMING,
+                "postings": self._postings,
+                "surface": self._surface,
+                "words": self._words,
+                "documents": self._documents,
+                "total_length": self._total_length,
+                "checksum": self._checksum,
+            }
+            data = pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(path + ".tmp", "wb") as snapshot_file:
+            snapshot_file.write(data)
+        os.replace(path + ".tmp", path)
+
+    def load_or_rebuild(self, path=SEARCH_SNAPSHOT_PATH):
+        """
+        Load the snapshot if it still matches the content of question_master,
+        otherwise rebuild from the database. Comparing checksums reads every
+        row but skips the tokenizing, so edits made while the server was down,
+        also by other processes, are never served from a stale snapshot.
+        """
+        if os.path.exists(path):
+            with open(path, "rb") as snapshot_file:
+                snapshot = pickle.load(snapshot_file)
+            documents = snapshot.get("documents", {})
+            if (snapshot.get("version") == SNAPSHOT_VERSION
+                    and snapshot.get("stemming") == SEARCH_STEMMING
+                    and _table_checksum() == snapshot["checksum"]):
+                with self._lock:
+                    self._postings = snapshot["postings"]
+                    self._surface = snapshot["surface"]
+                    self._words = snapshot["words"]
+                    self._documents = documents
+                    self._total_length = snapshot["total_length"]
+                    self._checksum = snapshot["checksum"]
+                    self.ready = True
+                return {"documents": len(documents), "source": "snapshot"}
+        return {**self.rebuild(), "source": "database"}
+
+    # Querying
+
+    def search(self, query: str, limit: int = 20):
+        """
+        Return [(question_id, score)] for questions matching every query word.
+        The last word also matches as a prefix unless the query ends in a space.
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+        typing_last_word = not query[-1:].isspace()
+
+        with self._lock:
+            # Each group lists the stems that can satisfy one query word
+            groups = []
+            for word in (words[:-1] if typing_last_word else words):
+                term = stem(word)
+                if term not in self._postings:
+                    return []
+                groups.append([term])
+            if typing_last_word:
+                terms = self._expand_prefix(words[-1])
+                if stem(words[-1]) in self._postings:
+                    # The word may already be complete, e.g. "managing" -> "manag"
+                    terms = sorted(set(terms) | {stem(words[-1])})
+                if not terms:
+                    return []
+                groups.append(terms)
+
+            document_count = len(self._documents)
+            average_length = self._total_length / document_count if document_count else 1.0
+            weighted_groups = [
+                [(self._postings[term], self._idf(len(self._postings[term]), document_count)) for term in group]
+                for group in groups
+            ]
+            # Rarest word first, so later words only need lookups for the survivors
+            weighted_groups.sort(key=lambda group: sum(len(postings) for postings, _ in group))
+
+            # BM25 with the length normalisation folded into two constants
+            norm_base = K1 * (1 - B)
+            norm_per_length = K1 * B / average_length
+            documents = self._documents
+
+            scores = None
+            for group in weighted_groups:
+                group_scores = {}
+                for postings, idf in group:
+                    weight = idf * (K1 + 1)
+                    if scores is None:
+                        matches = postings.items()
+                    else:
+                        matches = ((question_id, postings[question_id]) for question_id in scores if question_id in postings)
+                    for question_id, frequency in matches:
+                        score = weight * frequency / (frequency + norm_base + norm_per_length * documents[question_id][2])
+                        # A word matched through several stems counts once, at its best
+                        if score > group_scores.get(question_id, 0.0):
+                            group_scores[question_id] = score
+                if scores is None:
+                    scores = group_scores
+                else:
+                    scores = {question_id: scores[question_id] + score for question_id, score in group_scores.items()}
+                if not scores:
+                    return []
+
+        return heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+
+    def _expand_prefix(self, prefix):
+        """
+        Stems of the most common indexed words starting with prefix
+        """
+        start = bisect.bisect_left(self._words, prefix)
+        words = []
+        for word in self._words[start:]:
+            if not word.startswith(prefix):
+                break
+            words.append(word)
+        if len(words) > MAX_PREFIX_EXPANSIONS:
+            words = heapq.nlargest(MAX_PREFIX_EXPANSIONS, words, key=self._surface.get)
+        return sorted({stem(word) for word in words} & self._postings.keys())
+
+    @staticmethod
+    def _idf(document_frequency, document_count):
+        return math.log(1 + (document_count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "building": self._building,
+                "documents": len(self._documents),
+                "terms": len(self._postings),
+                "words": len(self._words),
+            }
+
+
+def _table_checksum():
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            models.QuestionModel.question_id,
+            models.QuestionModel.question,
+            models.QuestionModel.context,
+            models.QuestionModel.phase,
+            models.QuestionModel.section
+        ).yield_per(10000)
+        return sum(content_hash(row) for row in rows) % CHECKSUM_MODULUS
+    finally:
+        db.close()
+
+
+question_index = QuestionSearchIndex() if SEARCH_INDEX_ENABLED else None
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        print("usage: python search.py rebuild")
+        sys.exit(2)
+    index = QuestionSearchIndex()
+    result = index.rebuild()
+    index.save()
+    print(f"Indexed {result['documents']} questions in {result['seconds']:.1f}s; "
+          f"snapshot written to {SEARCH_SNAPSHOT_PATH}")
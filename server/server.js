@@ -100,13 +100,16 @@ app.post('/api/auth/login', async (req, res) => {
     const { email, password } = req.body;
     console.log("Login attempt for:", email);
 
-    // Get all users from FastAPI
-    const response = await axios.get(`${FASTAPI_URL}/users`);
-    const allUsers = response.data;
-    console.log("Users fetched:", allUsers.length);
-
-    // Find user by email
-    const user = allUsers.find(u => u.email === email);
+    // Look up the user (with its global role) by email in FastAPI
+    let user = null;
+    try {
+      const response = await axios.get(`${FASTAPI_URL}/users/lookup`, { params: { email } });
+      user = response.data;
+    } catch (lookupError) {
+      if (!lookupError.response || lookupError.response.status !== 404) {
+        throw lookupError;
+      }
+    }
     
     if (!user) {
       console.log("User not found, using default user for demo");
@@ -137,15 +140,8 @@ app.post('/api/auth/login', async (req, res) => {
     
     console.log("User found:", user.user_id);
     
-    // Get user's role from FastAPI
-    let userRole = "user"; // Default role
-    try {
-      const roleResponse = await axios.get(`${FASTAPI_URL}/user-roles/${user.user_id}`);
-      userRole = roleResponse.data.access_type;
-    } catch (roleError) {
-      console.error("Error fetching user role:", roleError);
-      // Continue with default role
-    }
+    // The lookup already resolved the user's global role
+    const userRole = user.access_type || "user"; // Default role
 
     // Generate JWT with user ID and role
     const token = jwt.sign(
@@ -289,7 +285,9 @@ app.get('/api/models', async (req, res) => {
 // Templates routes
 app.get('/api/templates', verifyToken, async (req, res) => {
   try {
-    const response = await fetch(`${FASTAPI_URL}/templates`);
+    // Pass through summary, filter and paging parameters
+    const queryParams = new URLSearchParams(req.query).toString();
+    const response = await fetch(`${FASTAPI_URL}/templates${queryParams ? `?${queryParams}` : ''}`);
     
     if (!response.ok) {
       console.error(`Error fetching templates: ${response.status} ${response.statusText}`);
@@ -340,21 +338,22 @@ app.post('/api/templates', verifyToken, async (req, res) => {
     if (templateData.users && templateData.users.length > 0) {
       const templateId = template.template_id;
       
-      // Process each user access record sequentially
-      for (const user of templateData.users) {
-        const accessData = {
-          template_id: templateId,
-          user_id: user.user_id,
-          access_type: user.access_type || 'editor'
-        };
-        
-        await fetch(`${FASTAPI_URL}/templates/${templateId}/access`, {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json'
-          },
-          body: JSON.stringify(accessData)
-        });
+      // Grant all users access in one request
+      const grants = templateData.users.map(user => ({
+        user_id: user.user_id,
+        access_type: user.access_type || 'editor'
+      }));
+      
+      const accessResponse = await fetch(`${FASTAPI_URL}/templates/${templateId}/access/bulk`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(grants)
+      });
+      
+      if (!accessResponse.ok) {
+        console.error(`Error granting template access: ${accessResponse.status} ${accessResponse.statusText}`);
       }
     }
     
@@ -365,30 +364,65 @@ app.post('/api/templates', verifyToken, async (req, res) => {
   }
 });
 
-app.get('/api/templates/:id', verifyToken, async (req, res) => {
+app.post('/api/templates/:id/clone', verifyToken, async (req, res) => {
   try {
     const { id } = req.params;
-    const response = await fetch(`${FASTAPI_URL}/templates/${id}`);
+    const cloneData = req.body || {};
+    
+    // The copy belongs to the current user unless specified otherwise
+    if (!cloneData.created_by && req.user) {
+      cloneData.created_by = req.user.user_id;
+    }
+    
+    const response = await fetch(`${FASTAPI_URL}/templates/${id}/clone`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json'
+      },
+      body: JSON.stringify(cloneData)
+    });
     
     if (!response.ok) {
       if (response.status === 404) {
         return res.status(404).json({ error: 'Template not found' });
       }
-      console.error(`Error fetching template: ${response.status} ${response.statusText}`);
-      return res.status(response.status).json({ error: 'Failed to fetch template' });
+      if (response.status === 422) {
+        const errorData = await response.json();
+        return res.status(422).json({
+          error: 'Validation error',
+          details: errorData.detail
+        });
+      }
+      console.error(`Error cloning template: ${response.status} ${response.statusText}`);
+      return res.status(response.status).json({ error: 'Failed to clone template' });
     }
     
     const template = await response.json();
+    res.status(201).json(template);
+  } catch (error) {
+    console.error('Error cloning template:', error);
+    res.status(500).json({ error: 'Internal server error' });
+  }
+});
+
+app.get('/api/templates/:id', verifyToken, async (req, res) => {
+  try {
+    const { id } = req.params;
+    // Template, questions, access records and creator in one request
+    const response = await fetch(`${FASTAPI_URL}/templates/${id}?include=questions,access,creator`);
     
-    // Get users with access to this template
-    const accessResponse = await fetch(`${FASTAPI_URL}/templates/${id}/access`);
-    let users = [];
-    
-    if (accessResponse.ok) {
-      users = await accessResponse.json();
+    if (!response.ok) {
+      if (response.status === 404) {
+        return res.status(404).json({ error: 'Template not found' });
+      }
+      console.error(`Error fetching template: ${response.status} ${response.statusText}`);
+      return res.status(response.status).json({ error: 'Failed to fetch template' });
     }
     
-    template.users = users;
+    const { access, ...template } = await response.json();
+    
+    // Users with access to this template
+    template.users = access || [];
     res.json(template);
   } catch (error) {
     console.error('Error fetching template:', error);
@@ -571,6 +605,40 @@ app.post('/api/templates/:id/questions', verifyToken, async (req, res) => {
   }
 });
 
+app.put('/api/templates/:templateId/questions/:questionId/position', verifyToken, async (req, res) => {
+  try {
+    const { templateId, questionId } = req.params;
+    const response = await fetch(`${FASTAPI_URL}/templates/${templateId}/questions/${questionId}/position`, {
+      method: 'PUT',
+      headers: {
+        'Content-Type': 'application/json'
+      },
+      body: JSON.stringify({ position: req.body.position })
+    });
+    
+    if (!response.ok) {
+      if (response.status === 404) {
+        return res.status(404).json({ error: 'Template or question not found' });
+      }
+      if (response.status === 400 || response.status === 422) {
+        const errorData = await response.json();
+        return res.status(response.status).json({
+          error: 'Validation error',
+          details: errorData.detail
+        });
+      }
+      console.error(`Error moving template question: ${response.status} ${response.statusText}`);
+      return res.status(response.status).json({ error: 'Failed to move template question' });
+    }
+    
+    const mapping = await response.json();
+    res.json(mapping);
+  } catch (error) {
+    console.error('Error moving template question:', error);
+    res.status(500).json({ error: 'Internal server error' });
+  }
+});
+
 app.delete('/api/templates/:templateId/questions/:questionId', verifyToken, async (req, res) => {
   try {
     const { templateId, questionId } = req.params;
@@ -736,6 +804,41 @@ app.get('/api/audit/:audit_id', verifyToken, async (req, res) => {
   }
 });
 
+// Templates a user can access (the user themselves or an admin)
+app.get('/api/users/:user_id/templates', verifyToken, async (req, res) => {
+  try {
+    const isAdmin = req.user && req.user.access_type === 'administrator';
+    const isSelf = req.user && String(req.user.user_id) === req.params.user_id;
+    
+    if (!isAdmin && !isSelf) {
+      return res.status(403).json({ message: 'Forbidden: Administrator access required' });
+    }
+    
+    // Forward query parameters
+    const queryParams = new URLSearchParams(req.query).toString();
+    const url = `${FASTAPI_URL}/users/${req.params.user_id}/templates${queryParams ? `?${queryParams}` : ''}`;
+    
+    const response = await axios.get(url);
+    res.status(response.status).json(response.data);
+  } catch (error) {
+    console.error('Error fetching user templates:', error);
+    
+    // Forward errors
+    if (error.response) {
+      return res.status(error.response.status).json({
+        message: 'Failed to fetch user templates',
+        error: error.response.data
+      });
+    }
+    
+    // Generic error
+    res.status(500).json({ 
+      message: 'Failed to fetch user templates',
+      error: error.message
+    });
+  }
+});
+
 // Update user (admin only)
 app.put('/api/users/:user_id', verifyToken, async (req, res) => {
   try {
@@ -800,6 +903,52 @@ app.put('/api/users/:user_id', verifyToken, async (req, res) => {
 });
 
 // Update user role (admin only)
+app.post('/api/user-roles/bulk', verifyToken, async (req, res) => {
+  try {
+    // Check if user is an administrator
+    const isAdmin = req.user && req.user.access_type === 'administrator';
+    
+    if (!isAdmin) {
+      return res.status(403).json({ message: 'Forbidden: Administrator access required' });
+    }
+    
+    const assignments = Array.isArray(req.body) ? req.body : [];
+    
+    // Validate access_type
+    const validTypes = ['administrator', 'editor', 'user'];
+    if (assignments.some(assignment => !validTypes.includes(assignment.access_type))) {
+      return res.status(400).json({ 
+        message: 'Invalid access_type',
+        validTypes
+      });
+    }
+    
+    // Forward the request to FastAPI
+    const response = await axios.post(`${FASTAPI_URL}/user-roles/bulk`, assignments.map(
+      ({ user_id, access_type }) => ({ user_id, access_type })
+    ));
+    
+    // Return the per-user outcomes
+    res.status(response.status).json(response.data);
+  } catch (error) {
+    console.error('Error updating user roles:', error);
+    
+    // Forward errors
+    if (error.response) {
+      return res.status(error.response.status).json({
+        message: 'Failed to update user roles',
+        error: error.response.data
+      });
+    }
+    
+    // Generic error
+    res.status(500).json({ 
+      message: 'Failed to update user roles',
+      error: error.message
+    });
+  }
+});
+
 app.post('/api/user-roles', verifyToken, async (req, res) => {
   try {
     // Check if user is an administrator
@@ -854,25 +1003,12 @@ app.get('/api/user-roles', verifyToken, async (req, res) => {
       return res.status(403).json({ message: 'Forbidden: Administrator access required' });
     }
     
-    // Get all users from FastAPI
-    const usersResponse = await axios.get(`${FASTAPI_URL}/users`);
-    const users = usersResponse.data;
-    
-    // Get all user roles from FastAPI
-    const rolesResponse = await axios.get(`${FASTAPI_URL}/user-roles`);
-    const roles = rolesResponse.data;
-    
-    // Combine user details with roles
-    const usersWithRoles = users.map(user => {
-      const userRole = roles.find(r => r.user_id === user.user_id) || { access_type: 'user' };
-      return {
-        ...user,
-        access_type: userRole.access_type
-      };
-    });
+    // FastAPI joins users with their global roles; forward search and paging parameters
+    const queryParams = new URLSearchParams(req.query).toString();
+    const url = `${FASTAPI_URL}/users/roles${queryParams ? `?${queryParams}` : ''}`;
     
-    // Return combined data
-    res.json(usersWithRoles);
+    const response = await axios.get(url);
+    res.json(response.data);
   } catch (error) {
     console.error('Error fetching user roles:', error);
     
@@ -0,0 +1,216 @@
+"""
+Slow statement log.
+
+Statements that run longer than SLOW_QUERY_THRESHOLD_MS are appended as JSON
+lines to a rotating local file and aggregated in memory per statement
+fingerprint (the SQL with literals and IN lists normalised) for
+GET /debug/slow-queries. The first time a SELECT fingerprint is seen its
+EXPLAIN plan is captured on the same connection. String parameters are
+redacted before anything is stored.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import date, datetime, time as datetime_time
+from decimal import Decimal
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+
+SLOW_QUERY_LOG_ENABLED = os.getenv("SLOW_QUERY_LOG_ENABLED", "true").lower() == "true"
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_LOG_PATH = os.getenv("SLOW_QUERY_LOG_PATH", "slow_queries.log")
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "5"))
+
+# Most fingerprints kept in memory; the least recently seen is dropped first
+MAX_FINGERPRINTS = 500
+
+# ASGI scope of the request being handled, set by the HTTP middleware
+request_scope = ContextVar("request_scope", default=None)
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST_RE = re.compile(r"\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))*\s*\)")
+_VALUES_LIST_RE = re.compile(r"(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Statement with literals, placeholder lists and whitespace normalised, so
+    the same query with different values or IN-list lengths matches
+    """
+    normalised = _STRING_LITERAL_RE.sub("?", statement)
+    normalised = _NUMBER_LITERAL_RE.sub("?", normalised)
+    normalised = _PLACEHOLDER_LIST_RE.sub("(...)", normalised)
+    normalised = _VALUES_LIST_RE.sub(r"\1", normalised)
+    return _WHITESPACE_RE.sub(" ", normalised).strip().lower()
+
+
+def redact(parameters):
+    """
+    Keep numbers, booleans, dates and NULLs; replace everything else
+    """
+    if isinstance(parameters, dict):
+        return {key: redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact(value) for value in parameters]
+    if parameters is None or isinstance(parameters, (bool, int, float, Decimal)):
+        return parameters if not isinstance(parameters, Decimal) else float(parameters)
+    if isinstance(parameters, (datetime, date, datetime_time)):
+        return parameters.isoformat()
+    return "<redacted>"
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms=SLOW_QUERY_THRESHOLD_MS, path=SLOW_QUERY_LOG_PATH,
+                 max_bytes=SLOW_QUERY_LOG_MAX_BYTES, backups=SLOW_QUERY_LOG_BACKUPS):
+        self.threshold = threshold_ms / 1000.0
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+        # Statements finish in many worker threads
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # fingerprint hash -> aggregated entry
+
+        self._logger = logging.getLogger("slow_queries")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._handler_ready = False
+
+    def _ensure_handler(self):
+        # The file is only opened once there is something to write to it
+        if self._handler_ready:
+            return
+        with self._lock:
+            if not self._handler_ready:
+                if self.path and not any(isinstance(handler, RotatingFileHandler) for handler in self._logger.handlers):
+                    handler = RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backups,
+                                                  encoding="utf-8")
+                    handler.setFormatter(logging.Formatter("%(message)s"))
+                    self._logger.addHandler(handler)
+                self._handler_ready = True
+
+    def instrument(self, engine):
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def entries(self, limit=100):
+        """
+        Aggregated entries, the most total time first
+        """
+        with self._lock:
+            entries = [dict(entry, routes=sorted(entry["routes"])) for entry in self._entries.values()]
+        entries.sort(key=lambda entry: entry["total_ms"], reverse=True)
+        return entries[:limit]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._slow_query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_slow_query_started", None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        if duration < self.threshold:
+            return
+        self.record(conn, cursor, statement, parameters, executemany, duration)
+
+    def record(self, conn, cursor, statement, parameters, executemany, duration):
+        normalised = fingerprint(statement)
+        key = hashlib.sha1(normalised.encode()).hexdigest()[:16]
+        route = _current_route()
+        now = datetime.now().isoformat(timespec="seconds")
+        duration_ms = round(duration * 1000, 3)
+        redacted = redact(parameters) if not executemany else f"<{len(parameters)} parameter sets>"
+
+        with self._lock:
+            entry = self._entries.get(key)
+            first_occurrence = entry is None
+            if first_occurrence:
+                entry = self._entries[key] = {
+                    "fingerprint": key,
+                    "statement": normalised,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "last_ms": 0.0,
+                    "last_parameters": None,
+                    "routes": set(),
+                    "first_seen": now,
+                    "last_seen": now,
+                    "plan": None,
+                }
+                while len(self._entries) > MAX_FINGERPRINTS:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+            entry["count"] += 1
+            entry["total_ms"] = round(entry["total_ms"] + duration_ms, 3)
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_ms"] = duration_ms
+            entry["last_parameters"] = redacted
+            entry["last_seen"] = now
+            if route:
+                entry["routes"].add(route)
+
+        plan = None
+        if first_occurrence and not executemany:
+            plan = _explain(conn, cursor, statement, parameters)
+            with self._lock:
+                entry["plan"] = plan
+
+        self._ensure_handler()
+        self._logger.info(json.dumps({
+            "time": now,
+            "fingerprint": key,
+            "duration_ms": duration_ms,
+            "route": route,
+            "statement": statement,
+            "parameters": redacted,
+            "plan": plan,
+        }, default=str))
+
+
+def _current_route():
+    scope = request_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route else scope['path']}"
+
+
+def _explain(conn, cursor, statement, parameters):
+    """
+    EXPLAIN a SELECT on the connection that ran it. A raw DB-API cursor is
+    used so the EXPLAIN itself does not go through the engine events.
+    """
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return None
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    explain_cursor = cursor.connection.cursor()
+    try:
+        explain_cursor.execute(prefix + statement, parameters)
+        columns = [column[0] for column in explain_cursor.description or ()]
+        return [dict(zip(columns, row)) for row in explain_cursor.fetchall()]
+    except Exception as exc:
+        return [{"error": str(exc)}]
+    finally:
+        explain_cursor.close()
+
+
+slow_query_log = SlowQueryLog() if SLOW_QUERY_LOG_ENABLED else None
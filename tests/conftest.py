@@ -0,0 +1,54 @@
+"""
+The tests run against a throwaway SQLite database, never the one from .env.
+The environment is set here because database.py and main.py read it on import.
+"""
+import os
+import tempfile
+
+_workdir = tempfile.mkdtemp(prefix="surveymaster-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ["SEARCH_SNAPSHOT_PATH"] = os.path.join(_workdir, "search_index.pickle")
+os.environ["SLOW_QUERY_LOG_PATH"] = os.path.join(_workdir, "slow_queries.log")
+os.environ["AUDIT_SPOOL_PATH"] = os.path.join(_workdir, "audit_spool.jsonl")
+os.environ["AUDIT_MODE"] = "sync"
+os.environ["POOL_ADAPTIVE"] = "false"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import database  # noqa: E402
+import main  # noqa: E402
+import models  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def empty_database():
+    """
+    Every test starts from empty tables and an empty response cache
+    """
+    yield
+    with database.engine.begin() as connection:
+        for table in reversed(models.Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    if main.response_cache is not None:
+        main.response_cache.clear()
+
+
+@pytest.fixture
+def db():
+    session = database.SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app, raise_server_exceptions=False)
+
+
+@pytest.fixture
+def user(db):
+    user = models.UserModel(username="owner", email="owner@example.com", password_hash="x")
+    db.add(user)
+    db.commit()
+    return user
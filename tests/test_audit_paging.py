@@ -0,0 +1,42 @@
+"""
+GET /audit cursor pages walk every row exactly once, also when many rows
+share one created_at, as rows written in the same second do.
+"""
+from sqlalchemy import insert
+
+import models
+
+
+def test_pages_through_rows_sharing_created_at(db, client, user):
+    # One statement, so the server-side default gives every row the same timestamp
+    db.execute(insert(models.AuditDetailsModel).values([
+        {"user_id": user.user_id, "action_type": "UPDATE", "entity_type": "QUESTION", "entity_id": n}
+        for n in range(1, 6)
+    ]))
+    db.commit()
+    assert db.query(models.AuditDetailsModel.created_at).distinct().count() == 1
+
+    pages, cursor = [], ""
+    while cursor is not None and len(pages) < 10:
+        response = client.get("/audit", params={"cursor": cursor, "limit": 2})
+        assert response.status_code == 200
+        page = response.json()
+        pages.append([entry["entity_id"] for entry in page["items"]])
+        cursor = page["next_cursor"]
+
+    assert pages == [[5, 4], [3, 2], [1]]
+
+
+def test_pages_filtered_by_entity(db, client, user):
+    db.execute(insert(models.AuditDetailsModel).values([
+        {"user_id": user.user_id, "action_type": "UPDATE", "entity_type": entity_type, "entity_id": 1}
+        for entity_type in ["QUESTION", "TEMPLATE"] * 3
+    ]))
+    db.commit()
+
+    first = client.get("/audit", params={"entity_type": "TEMPLATE", "cursor": "", "limit": 2}).json()
+    second = client.get("/audit", params={"entity_type": "TEMPLATE", "cursor": first["next_cursor"], "limit": 2}).json()
+
+    ids = [entry["audit_id"] for entry in first["items"] + second["items"]]
+    assert len(ids) == len(set(ids)) == 3
+    assert second["next_cursor"] is None
@@ -0,0 +1,49 @@
+"""
+Every GET /audit filter combination, on the first page and on a cursor page,
+must be answered from an index that already delivers rows in the
+(created_at, audit_id) order, without a full scan or a sort.
+"""
+from datetime import datetime
+
+import pytest
+
+import database
+import main
+import models
+
+FILTER_COMBINATIONS = [
+    {},
+    {"user_id": 1},
+    {"entity_type": "QUESTION"},
+    {"entity_id": 1},
+    {"entity_type": "QUESTION", "entity_id": 1},
+    {"action_type": "UPDATE"},
+    {"user_id": 1, "entity_type": "QUESTION"},
+    {"user_id": 1, "action_type": "UPDATE"},
+    {"entity_type": "QUESTION", "action_type": "UPDATE"},
+    {"entity_type": "QUESTION", "entity_id": 1, "action_type": "UPDATE"},
+    {"user_id": 1, "entity_type": "QUESTION", "entity_id": 1},
+]
+
+
+def query_plan(db, query):
+    connection = db.connection()
+    compiled = query.statement.compile(dialect=connection.dialect)
+    params = compiled.construct_params()
+    params = tuple(params[name] for name in compiled.positiontup)
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    return [row[3] for row in rows]
+
+
+@pytest.mark.parametrize("after", [None, (datetime(2026, 1, 1), 1000)], ids=["first page", "cursor page"])
+@pytest.mark.parametrize("filters", FILTER_COMBINATIONS, ids=lambda filters: ",".join(filters) or "no filter")
+def test_audit_page_uses_index_order(filters, after):
+    db = database.SessionLocal()
+    try:
+        query = main.filter_audit_query(db.query(models.AuditDetailsModel), **filters)
+        plan = query_plan(db, main.audit_page_query(query, after).limit(101))
+    finally:
+        db.close()
+
+    assert not [step for step in plan if step.startswith("SCAN") and "INDEX" not in step], plan
+    assert not [step for step in plan if "TEMP B-TREE" in step], plan
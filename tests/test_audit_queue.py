@@ -0,0 +1,75 @@
+"""
+Buffered audit writer: entries left in the spool by a crash are written on
+the next start, and rows the database rejects are dead-lettered without
+holding back the rest of their batch.
+"""
+import json
+
+import pytest
+
+import models
+from audit_queue import AuditWriter
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return {"spool_path": str(tmp_path / "spool.jsonl"), "dead_letter_path": str(tmp_path / "dead.jsonl")}
+
+
+def entry(user_id, entity_id):
+    return {"user_id": user_id, "action_type": "UPDATE", "entity_type": "QUESTION", "entity_id": entity_id}
+
+
+def written_entity_ids(db):
+    return sorted(entity_id for (entity_id,) in db.query(models.AuditDetailsModel.entity_id))
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as lines:
+        return [json.loads(line) for line in lines]
+
+
+@pytest.mark.anyio
+async def test_spool_replayed_after_crash(db, user, paths):
+    crashed = AuditWriter(flush_interval=60, **paths)
+    await crashed.start()
+    crashed.enqueue(entry(user.user_id, 1))
+    crashed.enqueue(entry(user.user_id, 2))
+    # Die without flushing, halfway through writing a third line
+    crashed._task.cancel()
+    crashed._spool.write('{"seq": 3, "entr')
+    crashed._spool.close()
+    assert written_entity_ids(db) == []
+
+    writer = AuditWriter(flush_interval=60, **paths)
+    await writer.start()
+    await writer.stop()
+
+    assert written_entity_ids(db) == [1, 2]
+    assert writer.metrics()["replayed"] == 2
+    assert read_lines(paths["spool_path"]) == []
+
+
+@pytest.mark.anyio
+async def test_rejected_row_is_dead_lettered(db, user, paths):
+    writer = AuditWriter(flush_interval=60, **paths)
+    await writer.start()
+    writer.enqueue(entry(user.user_id, 1))
+    writer.enqueue(entry(999999, 2))  # no such user: the foreign key rejects it
+    writer.enqueue(entry(user.user_id, 3))
+    await writer.flush()
+    metrics = writer.metrics()
+    await writer.stop()
+
+    assert written_entity_ids(db) == [1, 3]
+    dead = read_lines(paths["dead_letter_path"])
+    assert [line["entry"]["entity_id"] for line in dead] == [2]
+    assert metrics["dead_lettered"] == 1
+    assert metrics["flushed"] == 2
+    assert metrics["flush_failures"] == 1
+    assert read_lines(paths["spool_path"]) == []
@@ -0,0 +1,72 @@
+"""
+Adaptive pool sizing never lets the pool open more than max_size
+connections, overflow included.
+"""
+import pytest
+from sqlalchemy import create_engine, exc
+
+from pool import InstrumentedQueuePool, PoolAutoscaler
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool, pool_size=4, max_overflow=6, pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+
+def checkout_all(engine):
+    connections = []
+    try:
+        while True:
+            connections.append(engine.pool.connect())
+    except exc.TimeoutError:
+        pass
+    for connection in connections:
+        connection.close()
+    return len(connections)
+
+
+def grow(autoscaler):
+    # An interval in which every checkout waited too long
+    autoscaler._observe_wait(1.0, False)
+    return autoscaler.adjust()
+
+
+def test_growth_takes_connections_from_overflow(engine):
+    autoscaler = PoolAutoscaler(max_size=10, wait_target_ms=5)
+    autoscaler.instrument(engine)
+
+    sizes = []
+    while (size := grow(autoscaler)) is not None:
+        sizes.append(size)
+
+    assert sizes[-1] == 10
+    assert engine.pool.size() + engine.pool._max_overflow == 10
+    assert checkout_all(engine) == 10
+
+
+def test_max_size_below_configured_overflow(engine):
+    autoscaler = PoolAutoscaler(max_size=6, wait_target_ms=5)
+    autoscaler.instrument(engine)
+    assert checkout_all(engine) == 6
+
+    grow(autoscaler)
+    assert engine.pool.size() == 5
+    assert checkout_all(engine) == 6
+
+
+def test_shrinking_gives_overflow_back(engine):
+    autoscaler = PoolAutoscaler(min_size=2, max_size=10, shrink_after=1)
+    autoscaler.instrument(engine)
+    while grow(autoscaler) is not None:
+        pass
+
+    # Idle intervals: nothing checked out
+    autoscaler.adjust()
+    assert engine.pool.size() == 9
+    assert engine.pool._max_overflow == 1
+    assert checkout_all(engine) == 10
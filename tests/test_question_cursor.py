@@ -0,0 +1,38 @@
+"""
+GET /questions rejects malformed cursors and sorts with a 400 instead of
+passing them on to the database.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app, raise_server_exceptions=False)
+
+
+@pytest.mark.parametrize("values", [
+    ["question_id", [1], 1],
+    ["question_id", {"a": 1}, 1],
+    ["question_id", 1, [1]],
+    ["question_id", "1", 1],
+    ["question_id", True, 1],
+    ["phase", 1, 1],
+    ["phase", "design", None],
+    [["question_id"], 1, 1],
+    ["--question_id", 1, 1],
+    ["question_id", 1],
+])
+def test_malformed_cursor_is_rejected(values):
+    response = client.get("/questions", params={"cursor": main.encode_cursor(*values)})
+    assert response.status_code == 400
+
+
+def test_sort_strips_a_single_minus():
+    assert client.get("/questions", params={"sort": "--phase"}).status_code == 400
+    assert client.get("/questions", params={"sort": "-phase"}).status_code == 200
+
+
+def test_cursor_round_trip():
+    response = client.get("/questions", params={"sort": "-phase", "cursor": main.encode_cursor("-phase", "design", 5)})
+    assert response.status_code == 200
+    assert "items" in response.json()
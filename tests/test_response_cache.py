@@ -0,0 +1,84 @@
+"""
+Mutating endpoints drop exactly the cached responses built from the rows
+they change: the next read of those is fresh, every other entry stays cached.
+"""
+import pytest
+
+import main
+import models
+
+
+@pytest.fixture
+def templates(db, user):
+    question = models.QuestionModel(context="context", question="Original wording", phase="design",
+                                    section="general", answer_type="text", created_by=user.user_id)
+    first = models.TemplateModel(name="First", type="survey", created_by=user.user_id)
+    second = models.TemplateModel(name="Second", type="survey", created_by=user.user_id)
+    db.add_all([question, first, second])
+    db.flush()
+    db.add(models.TemplateDefinitionModel(template_id=first.template_id, question_id=question.question_id, order=1024))
+    db.commit()
+    return first.template_id, second.template_id, question.question_id
+
+
+def read(client, template_id, include="questions,access"):
+    response = client.get(f"/templates/{template_id}", params={"include": include})
+    assert response.status_code == 200
+    return response.json()
+
+
+def hits():
+    return main.response_cache.stats()["hits"]
+
+
+def warm(client, *template_ids):
+    for template_id in template_ids:
+        read(client, template_id)
+    started = hits()
+    for template_id in template_ids:
+        read(client, template_id)
+    assert hits() == started + len(template_ids)
+
+
+def test_template_edit_invalidates_its_detail(client, templates):
+    first, second, _ = templates
+    warm(client, first, second)
+
+    assert client.put(f"/templates/{first}", json={"name": "Renamed"}).status_code == 200
+
+    started = hits()
+    assert read(client, first)["name"] == "Renamed"
+    assert read(client, second)["name"] == "Second"
+    assert hits() == started + 1
+
+
+def test_question_edit_invalidates_templates_embedding_it(client, templates):
+    first, second, question_id = templates
+    warm(client, first, second)
+
+    response = client.put(f"/questions/{question_id}", json={"question": "New wording"})
+    assert response.status_code == 200
+
+    started = hits()
+    assert [question["question"] for question in read(client, first)["questions"]] == ["New wording"]
+    assert read(client, second)["questions"] == []
+    assert hits() == started + 1
+
+
+def test_bulk_grant_invalidates_access(db, client, user, templates):
+    first, second, _ = templates
+    grantee = models.UserModel(username="grantee", email="grantee@example.com", password_hash="x")
+    db.add(grantee)
+    db.commit()
+    warm(client, first, second)
+
+    response = client.post(f"/templates/{first}/access/bulk", json=[
+        {"user_id": grantee.user_id, "access_type": "editor"}
+    ])
+    assert response.status_code == 200
+
+    started = hits()
+    access = read(client, first)["access"]
+    assert [(grant["user_id"], grant["access_type"]) for grant in access] == [(grantee.user_id, "editor")]
+    assert read(client, second)["access"] == []
+    assert hits() == started + 1
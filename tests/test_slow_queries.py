@@ -0,0 +1,38 @@
+"""
+The slow query log only opens its file once a slow statement is recorded.
+"""
+import logging
+from logging.handlers import RotatingFileHandler
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from slow_queries import SlowQueryLog
+
+
+@pytest.fixture
+def file_logger():
+    file_logger = logging.getLogger("slow_queries")
+    saved = file_logger.handlers[:]
+    file_logger.handlers.clear()
+    yield file_logger
+    for handler in file_logger.handlers:
+        if isinstance(handler, RotatingFileHandler):
+            handler.close()
+    file_logger.handlers[:] = saved
+
+
+def test_log_file_created_on_first_slow_statement(tmp_path, file_logger):
+    path = tmp_path / "slow_queries.log"
+    slow_query_log = SlowQueryLog(threshold_ms=0, path=str(path))
+    engine = create_engine("sqlite://")
+    slow_query_log.instrument(engine)
+    assert not path.exists()
+    assert not [handler for handler in file_logger.handlers if isinstance(handler, RotatingFileHandler)]
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert path.exists()
+    assert '"statement": "SELECT 1"' in path.read_text()
+    assert slow_query_log.entries()[0]["count"] == 1
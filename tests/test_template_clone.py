@@ -0,0 +1,82 @@
+"""
+POST /templates/{template_id}/clone copies the question list and, unless
+told otherwise, the access grants, and validates its input before copying.
+"""
+import pytest
+
+import models
+
+
+@pytest.fixture
+def template_id(db, user):
+    template = models.TemplateModel(name="Source", purpose="Checks", type="survey", created_by=user.user_id)
+    questions = [
+        models.QuestionModel(context="context", question=f"Question {n}", phase="design",
+                             section="general", answer_type="text", created_by=user.user_id)
+        for n in range(3)
+    ]
+    grantees = [
+        models.UserModel(username=f"grantee{n}", email=f"grantee{n}@example.com", password_hash="x")
+        for n in range(2)
+    ]
+    db.add_all([template, *questions, *grantees])
+    db.flush()
+    # Sparse, non-sequential keys, as left behind by moves
+    for question, order in zip(questions, [3072, 512, 1536]):
+        db.add(models.TemplateDefinitionModel(template_id=template.template_id, question_id=question.question_id,
+                                              order=order))
+    for grantee, access_type in zip(grantees, ["editor", "user"]):
+        db.add(models.TemplateAccessModel(template_id=template.template_id, user_id=grantee.user_id,
+                                          access_type=access_type))
+    db.commit()
+    return template.template_id
+
+
+def question_orders(db, template_id):
+    return [(row.question_id, row.order) for row in db.query(models.TemplateDefinitionModel).filter(
+        models.TemplateDefinitionModel.template_id == template_id
+    ).order_by(models.TemplateDefinitionModel.order)]
+
+
+def grants(db, template_id):
+    return sorted((row.user_id, row.access_type) for row in db.query(models.TemplateAccessModel).filter(
+        models.TemplateAccessModel.template_id == template_id
+    ))
+
+
+def test_clone_copies_questions_and_grants(db, client, template_id):
+    response = client.post(f"/templates/{template_id}/clone", json={})
+    assert response.status_code == 201
+    clone = response.json()
+    assert clone["template_id"] != template_id
+    assert (clone["name"], clone["purpose"], clone["type"]) == ("Source (copy)", "Checks", "survey")
+
+    assert question_orders(db, clone["template_id"]) == question_orders(db, template_id)
+    assert len(question_orders(db, template_id)) == 3
+    assert grants(db, clone["template_id"]) == grants(db, template_id)
+    assert len(grants(db, template_id)) == 2
+
+
+def test_clone_without_access(db, client, template_id):
+    response = client.post(f"/templates/{template_id}/clone", json={"name": "Copy", "include_access": False})
+    assert response.status_code == 201
+    clone = response.json()
+
+    assert clone["name"] == "Copy"
+    assert question_orders(db, clone["template_id"]) == question_orders(db, template_id)
+    assert grants(db, clone["template_id"]) == []
+
+
+def test_clone_name_too_long(client, template_id):
+    response = client.post(f"/templates/{template_id}/clone", json={"name": "x" * 101})
+    assert response.status_code == 400
+
+
+def test_clone_for_unknown_user(client, template_id):
+    response = client.post(f"/templates/{template_id}/clone", json={"created_by": 999999})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "User not found"
+
+
+def test_clone_of_unknown_template(client):
+    assert client.post("/templates/999999/clone", json={}).status_code == 404
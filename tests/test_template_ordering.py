@@ -0,0 +1,138 @@
+"""
+Template question order keys: a save writes only the rows it adds or moves,
+single moves write one row, and keys are respread only when a gap runs out.
+"""
+import pytest
+
+import models
+
+
+@pytest.fixture
+def template(db, user):
+    template = models.TemplateModel(name="Ordering", type="survey", created_by=user.user_id)
+    db.add(template)
+    db.commit()
+    return template
+
+
+def add_questions(db, user, count):
+    questions = [
+        models.QuestionModel(context="context", question=f"Question {n}", phase="design",
+                             section="general", answer_type="text", created_by=user.user_id)
+        for n in range(count)
+    ]
+    db.add_all(questions)
+    db.commit()
+    return [question.question_id for question in questions]
+
+
+def stored_orders(db, template_id):
+    db.expire_all()
+    return {
+        question_id: order for question_id, order in db.query(
+            models.TemplateDefinitionModel.question_id, models.TemplateDefinitionModel.order
+        ).filter(models.TemplateDefinitionModel.template_id == template_id)
+    }
+
+
+def sequence(orders):
+    return sorted(orders, key=orders.get)
+
+
+def save(client, template_id, question_ids):
+    response = client.post(f"/templates/{template_id}/questions", json=[
+        {"question_id": question_id, "order": index + 1} for index, question_id in enumerate(question_ids)
+    ])
+    assert response.status_code == 201
+    return response.json()
+
+
+def move(client, template_id, question_id, position):
+    response = client.put(f"/templates/{template_id}/questions/{question_id}/position", json={"position": position})
+    assert response.status_code == 200
+    return response.json()
+
+
+def written(before, after):
+    return sum(1 for question_id, order in after.items() if before.get(question_id) != order)
+
+
+def test_editor_save_after_move_writes_only_the_new_row(db, client, user, template):
+    question_ids = add_questions(db, user, 201)
+    save(client, template.template_id, question_ids[:200])
+    move(client, template.template_id, question_ids[199], 0)
+    before = stored_orders(db, template.template_id)
+
+    # The editor posts dense orders for anything but a single move
+    save(client, template.template_id, sequence(before) + [question_ids[200]])
+    after_append = stored_orders(db, template.template_id)
+    assert written(before, after_append) == 1
+    assert sequence(after_append) == sequence(before) + [question_ids[200]]
+
+    # The sparse keys survived, so the next move is a single row again
+    move(client, template.template_id, question_ids[0], 150)
+    after_move = stored_orders(db, template.template_id)
+    assert written(after_append, after_move) == 1
+    assert sequence(after_move).index(question_ids[0]) == 150
+
+
+def test_save_reorders_only_moved_rows(db, client, user, template):
+    a, b, c, d = add_questions(db, user, 4)
+    save(client, template.template_id, [a, b, c, d])
+    before = stored_orders(db, template.template_id)
+
+    save(client, template.template_id, [a, c, b, d])
+    after = stored_orders(db, template.template_id)
+    assert sequence(after) == [a, c, b, d]
+    assert written(before, after) == 1
+
+
+def test_move_inserts_question_at_position(db, client, user, template):
+    a, b, c, new = add_questions(db, user, 4)
+    save(client, template.template_id, [a, b, c])
+    before = stored_orders(db, template.template_id)
+
+    move(client, template.template_id, new, 1)
+    after = stored_orders(db, template.template_id)
+    assert sequence(after) == [a, new, b, c]
+    assert written(before, after) == 1
+
+
+def test_move_rebalances_when_neighbours_touch(db, client, user, template):
+    a, b, c, d = add_questions(db, user, 4)
+    # Dense keys, as written before order keys were spread out
+    db.add_all([
+        models.TemplateDefinitionModel(template_id=template.template_id, question_id=question_id, order=order)
+        for order, question_id in enumerate([a, b, c, d], start=1)
+    ])
+    db.commit()
+
+    move(client, template.template_id, d, 1)
+    after = stored_orders(db, template.template_id)
+    assert sequence(after) == [a, d, b, c]
+    keys = sorted(after.values())
+    assert all(upper - lower > 1 for lower, upper in zip(keys, keys[1:]))
+
+    # Respread once; the next move finds a gap again
+    move(client, template.template_id, c, 0)
+    assert written(after, stored_orders(db, template.template_id)) == 1
+
+
+def test_move_after_question(db, client, user, template):
+    a, b, c, d = add_questions(db, user, 4)
+    save(client, template.template_id, [a, b, c, d])
+    before = stored_orders(db, template.template_id)
+
+    url = f"/templates/{template.template_id}/questions/{d}/position"
+    assert client.put(url, json={"after_question_id": a}).status_code == 200
+    after = stored_orders(db, template.template_id)
+    assert sequence(after) == [a, d, b, c]
+    assert written(before, after) == 1
+
+    assert client.put(url, json={"after_question_id": None}).status_code == 200
+    assert sequence(stored_orders(db, template.template_id)) == [d, a, b, c]
+
+    assert client.put(url, json={"after_question_id": d}).status_code == 400
+    assert client.put(url, json={}).status_code == 400
+    missing = add_questions(db, user, 1)[0]
+    assert client.put(url, json={"after_question_id": missing}).status_code == 404
@@ -0,0 +1,145 @@
+"""
+Template question lists: loading one costs the same number of statements
+whatever its size, and saving one writes only the difference.
+"""
+from sqlalchemy import event
+
+import database
+import main
+import models
+
+
+def make_template(db, user, size):
+    template = models.TemplateModel(name=f"{size} questions", type="survey", created_by=user.user_id)
+    db.add(template)
+    db.flush()
+    for position in range(size):
+        question = models.QuestionModel(
+            context="context", question=f"Question {position}", phase="design",
+            section="general", answer_type="text", created_by=user.user_id
+        )
+        db.add(question)
+        db.flush()
+        db.add(models.TemplateDefinitionModel(
+            template_id=template.template_id, question_id=question.question_id, order=(size - position) * 1024
+        ))
+    db.flush()
+    return template.template_id
+
+
+def count_statements(db, template_id):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    db.expire_all()
+    event.listen(database.engine, "before_cursor_execute", record)
+    try:
+        questions = main.load_template_questions(db, template_id)
+        # Touch every column the responses serialise, so lazy loads would count too
+        for question in questions:
+            (question.question_id, question.context, question.question, question.phase,
+             question.section, question.answer_type, question.created_by)
+    finally:
+        event.remove(database.engine, "before_cursor_execute", record)
+    return len(statements), questions
+
+
+def test_statement_count_does_not_grow_with_template_size(db):
+    user = models.UserModel(username="template-owner", email="owner@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    small = make_template(db, user, 2)
+    large = make_template(db, user, 50)
+
+    small_count, small_questions = count_statements(db, small)
+    large_count, large_questions = count_statements(db, large)
+
+    assert (len(small_questions), len(large_questions)) == (2, 50)
+    assert small_count == large_count == 1
+    # Returned in template order, which is the reverse of insertion here
+    assert [question.question for question in large_questions] == [f"Question {n}" for n in range(49, -1, -1)]
+
+
+def saved_sequence(db, template_id):
+    db.expire_all()
+    return [question_id for (question_id,) in db.query(models.TemplateDefinitionModel.question_id).filter(
+        models.TemplateDefinitionModel.template_id == template_id
+    ).order_by(models.TemplateDefinitionModel.order)]
+
+
+def post_questions(client, template_id, question_ids):
+    return client.post(f"/templates/{template_id}/questions", json=[
+        {"question_id": question_id, "order": index + 1} for index, question_id in enumerate(question_ids)
+    ])
+
+
+def make_questions(db, user, count):
+    template_id = make_template(db, user, count)
+    db.commit()
+    return template_id, saved_sequence(db, template_id)[::-1]
+
+
+def test_save_deletes_inserts_and_reorders_in_one_call(db, client, user):
+    template_id, (a, b, c) = make_questions(db, user, 3)
+    _, (d,) = make_questions(db, user, 1)
+    post_questions(client, template_id, [a, b, c])
+    mapping_ids = {row.question_id: row.id for row in db.query(models.TemplateDefinitionModel).filter(
+        models.TemplateDefinitionModel.template_id == template_id
+    )}
+
+    response = post_questions(client, template_id, [c, a, d])
+    assert response.status_code == 201
+    assert [row["question_id"] for row in response.json()] == [c, a, d]
+    assert saved_sequence(db, template_id) == [c, a, d]
+    # Kept questions keep their rows; only b's row is gone
+    rows = {row.question_id: row.id for row in db.query(models.TemplateDefinitionModel).filter(
+        models.TemplateDefinitionModel.template_id == template_id
+    )}
+    assert rows[a] == mapping_ids[a] and rows[c] == mapping_ids[c]
+    assert b not in rows
+
+
+def test_unchanged_save_neither_commits_nor_invalidates(db, client, user):
+    template_id, question_ids = make_questions(db, user, 3)
+    post_questions(client, template_id, question_ids)
+    client.get(f"/templates/{template_id}", params={"include": "questions"})
+    cache_version = main.response_cache.version
+
+    commits = []
+
+    def record(session):
+        commits.append(session)
+
+    event.listen(database.SessionLocal, "after_commit", record)
+    try:
+        response = post_questions(client, template_id, question_ids)
+    finally:
+        event.remove(database.SessionLocal, "after_commit", record)
+
+    assert response.status_code == 201
+    assert commits == []
+    assert main.response_cache.version == cache_version
+
+
+def test_duplicate_question_is_rejected(db, client, user):
+    template_id, (a, b) = make_questions(db, user, 2)
+    post_questions(client, template_id, [a, b])
+
+    response = post_questions(client, template_id, [b, a, b])
+    assert response.status_code == 400
+    assert saved_sequence(db, template_id) == [a, b]
+
+
+def test_unknown_question_is_rejected(db, client, user):
+    template_id, (a, b) = make_questions(db, user, 2)
+    post_questions(client, template_id, [a, b])
+
+    response = post_questions(client, template_id, [a, 999999])
+    assert response.status_code == 404
+    assert saved_sequence(db, template_id) == [a, b]
+
+
+def test_unknown_template_is_rejected(client):
+    assert post_questions(client, 999999, []).status_code == 404
@@ -0,0 +1,37 @@
+"""
+Background work does not take worker threads from the endpoint threadpool
+(anyio's default limiter, sized by DB_THREADPOOL_SIZE).
+"""
+import asyncio
+
+import pytest
+from anyio import to_thread
+
+import models
+from audit_queue import AuditWriter
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_audit_flush_runs_while_endpoint_threads_are_busy(tmp_path, db, user):
+    writer = AuditWriter(spool_path=str(tmp_path / "spool.jsonl"), dead_letter_path=str(tmp_path / "dead.jsonl"),
+                         flush_interval=60)
+    await writer.start()
+
+    # Every endpoint thread is taken, e.g. by requests waiting on the database
+    limiter = to_thread.current_default_thread_limiter()
+    limiter.total_tokens = 1
+    borrower = object()
+    await limiter.acquire_on_behalf_of(borrower)
+    try:
+        writer.enqueue({"user_id": user.user_id, "action_type": "CREATE", "entity_type": "QUESTION", "entity_id": 1})
+        await asyncio.wait_for(writer.flush(), timeout=5)
+    finally:
+        limiter.release_on_behalf_of(borrower)
+        await writer.stop()
+
+    assert db.query(models.AuditDetailsModel).count() == 1